@@ -25,8 +25,8 @@ Goals of addon:
 Approach: Avoid code duplication or UI rewriting where possible. Use default
 invocation methods if possible. To do this, we will create a "queue" of imports
 which get triggered subsequently as prior imports complete. This will also keep
-the addon mostly stable, though does mean undo/redo would count as multiple
-steps.
+the addon mostly stable. Files imported without a popup are grouped into a
+single undo step, though each confirmed popup still counts as its own step.
 
 In user preferences, the user specifies which operator to use with which
 filetype. Good defaults will be provided, based on those built into blender.
@@ -46,18 +46,152 @@ bl_info = {
 	"tracker_url": "https://github.com/TheDuckCow/aardvark-any-importer"
 }
 
+import argparse
+import hashlib
+import heapq
 import importlib
+import json
+import multiprocessing
 import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import unquote
+
+try:
+	from multiprocessing import shared_memory
+except ImportError:  # python 3.7 and older
+	shared_memory = None
 
 import bpy
-from bpy_extras.io_utils import ImportHelper
+from bpy_extras.io_utils import ImportHelper, axis_conversion
+from mathutils import Matrix
+import numpy as np
 
 # Cache of bl_idname's and true/false availability to avoid slow UI drawing
 oper_cache = {}
 
-# queue of file (keys) to be imported (value: success bool)
+# Snapshot of operator names per bpy.ops submodule, backing oper_cache
+oper_registry = {}
+
+# Module names of the enabled add-ons when the snapshot was taken
+oper_registry_addons = None
+
+# Hit and miss counts of oper_cache lookups
+oper_cache_stats = {"hits": 0, "misses": 0}
+
+# queue of file (keys) to be imported (value: success bool, None if pending)
 import_queue = {}
 
+# State of the queue being drained, see queue_imports
+queue_state = {}
+
+# State of imports running in background processes, see start_sharded_import
+shard_state = {}
+
+# Warm background workers kept between imports, see start_pool_import
+worker_pool = None
+
+# State of the import being served by worker_pool
+pool_state = {}
+
+# Running average cost in ms of each kind of timer step, see run_budgeted
+step_costs = {}
+
+# Weight of the latest measure in the running averages of step_costs
+STEP_COST_SMOOTHING = 0.2
+
+# Executor parsing queued files ahead of the main thread, see get_parse_pool
+parse_pool = {"executor": None, "processes": 0, "shared": False}
+
+# Prefix of the lines a worker prints to report back, see run_import_worker
+WORKER_PREFIX = "AARDVARK_RESULT "
+
+# Rough import cost per byte by extension, relative to binary formats.
+# Text formats are slower to parse, used to balance parallel imports.
+EXTENSION_COSTS = {
+	"abc": 0.5,
+	"blend": 0.2,
+	"bvh": 3.0,
+	"dae": 4.0,
+	"dxf": 4.0,
+	"fbx": 1.0,
+	"obj": 4.0,
+	"stl": 1.0,
+	"svg": 3.0,
+	"wrl": 4.0,
+	"x3d": 4.0,
+}
+
+# Fixed cost of importing any file (operator call, scene updates), in bytes
+FILE_COST = 256 * 1024
+
+# Index of extension to (collection index, operator) over preferences,
+# rebuilt only after invalidate_association_index
+association_index = None
+
+# filter_glob for the import menu entry, derived from association_index
+# and whether fast handlers are enabled
+association_glob = None
+
+# Associations given on the command line, see main_cli
+cli_associations = {}
+
+# Operators whose results background workers can't return, see
+# split_worker_jobs
+LOCAL_OPERATORS = (
+	"text.open", "wm.append", "import_shape.mdd", "import_scene.import_chan")
+
+# Name of the installed add-on, also when this file is run with --python,
+# so the command line uses its saved associations and settings
+ADDON_NAME = "aardvark_any_importer" if __name__ == "__main__" else __name__
+
+# Default operators to use per extension, see reset_extensions
+DEFAULT_ASSOCIATIONS = {
+	# confirmed working
+	"bvh": "import_anim.bvh",
+	"fbx": "import_scene.fbx",
+	"obj": "import_scene.obj",
+
+	# should work
+	"abc": "wm.alembic_import",
+	"dae": "wm.collada_import",
+	"stl": "import_mesh.stl",
+	"svg": "import_curve.svg",
+	"dxf": "import_scene.dxf",
+	"ase": "import_ase.read",
+	"mdd": "import_shape.mdd",
+	"chan": "import_scene.import_chan",
+	"wrl": "import_scene.x3d",
+	"x3d": "import_scene.x3d",
+	"xyz": "import_mesh.xyz",  # also implements .pdb?
+	"glb": "import_scene.gltf",
+	"gltf": "import_scene.gltf",
+	# C++ importer since 3.6, the python one was removed in 4.0
+	"ply": "wm.ply_import" if bpy.app.version >= (3, 6, 0) else (
+		"import_mesh.ply"),
+	"txt": "text.open",
+	"rtf": "text.open",
+	"py": "text.open",
+
+	# Implement special case, where defaults to e.g. scene or collections
+	"blend": "wm.append"
+
+	# NOT working
+	# "jpg": "import_image.to_plane",
+	# "jpeg": "import_image.to_plane",
+	# "png": "import_image.to_plane",
+}
+
 
 def get_user_preferences(context=None):
 	"""Intermediate method for pre and post blender 2.8 grabbing preferences"""
@@ -65,9 +199,9 @@ def get_user_preferences(context=None):
 		context = bpy.context
 	prefs = None
 	if hasattr(context, "user_preferences"):  # 2.7
-		prefs = context.user_preferences.addons.get(__name__, None)
+		prefs = context.user_preferences.addons.get(ADDON_NAME, None)
 	elif hasattr(context, "preferences"):  # 2.8
-		prefs = context.preferences.addons.get(__name__, None)
+		prefs = context.preferences.addons.get(ADDON_NAME, None)
 	if prefs:
 		return prefs.preferences
 	return None
@@ -101,26 +235,161 @@ def layout_split(layout, factor=0.0, align=False):
 	return layout.split(factor=factor, align=align)
 
 
+def get_context_override(context=None):
+	"""Window and area members needed to run operators from timers"""
+	if not context:
+		context = bpy.context
+	wm = context.window_manager
+	window = context.window
+	if not window and wm.windows:
+		window = wm.windows[0]
+	if not window:
+		return {}
+	override = {"window": window, "screen": window.screen}
+	areas = [area for area in window.screen.areas if area.type == 'VIEW_3D']
+	if not areas:
+		areas = list(window.screen.areas)
+	if areas:
+		override["area"] = areas[0]
+		for region in areas[0].regions:
+			if region.type == 'WINDOW':
+				override["region"] = region
+				break
+	return override
+
+
+def call_with_override(oper_func, override, *args, **kwargs):
+	"""Intermediate method for pre and post blender 3.2 context overrides"""
+	if hasattr(bpy.context, "temp_override"):  # 3.2+
+		with bpy.context.temp_override(**override):
+			return oper_func(*args, **kwargs)
+	return oper_func(override, *args, **kwargs)
+
+
+def set_status_text(text, context=None):
+	"""Show text in the status bar, or clear it if text is None"""
+	window = get_context_override(context).get("window")
+	if not window:
+		return
+	if hasattr(bpy.context, "temp_override"):  # 3.2+
+		with bpy.context.temp_override(window=window):
+			window.workspace.status_text_set(text)
+	else:
+		# Prior to 3.2 this is a no-op outside of a window context (timers)
+		window.workspace.status_text_set(text)
+
+
+def count_file_browsers(context=None):
+	"""Number of open file browsers, used to wait on invoked importers"""
+	if not context:
+		context = bpy.context
+	return sum(
+		1 for window in context.window_manager.windows
+		for area in window.screen.areas if area.type == 'FILE_BROWSER')
+
+
+def count_data_blocks():
+	"""Rough count of the data importers add, to detect a cancelled popup.
+
+	Covers what the associated importers create: objects and their data,
+	animation, collections for appends and texts.
+	"""
+	return sum(len(getattr(bpy.data, name, ())) for name in (
+		"objects", "meshes", "curves", "armatures", "actions", "shape_keys",
+		"collections", "texts"))
+
+
+def get_association_index(context=None):
+	"""Return a dict of extension: (index, operator) of file associations.
+
+	Cached until the associations are added, removed, reset or edited. The
+	size is checked too, in case preferences were reloaded from disk.
+	"""
+	global association_index
+	prefs = get_user_preferences(context)
+	if not prefs or not prefs.file_extensions:
+		# Not enabled as an add-on, or never set up, use the defaults
+		index = {}
+		for ext, oper in DEFAULT_ASSOCIATIONS.items():
+			index[ext] = (None, oper)
+	else:
+		count = len(prefs.file_extensions)
+		if association_index is None or association_index[0] != count:
+			index = {}
+			for i, pset in enumerate(prefs.file_extensions):
+				if pset.extension not in index:
+					index[pset.extension] = (i, pset.operator)
+			association_index = (count, index)
+		index = association_index[1]
+	if cli_associations:
+		# Given on the command line, override those of the preferences
+		index = dict(index)
+		for ext, oper in cli_associations.items():
+			index[ext] = (None, oper)
+	return index
+
+
+def invalidate_association_index():
+	"""Mark the extension index stale, after changing file associations"""
+	global association_index, association_glob
+	association_index = None
+	association_glob = None
+
+
 def reset_oper_cache():
 	"""Way to reset cache of operator availabilty, to avoid stale pref draw"""
-	global oper_cache
+	global oper_cache, oper_registry
 	oper_cache = {}
+	oper_registry = {}
+
+
+def sync_oper_cache(context=None):
+	"""Reset the operator cache only if add-ons were enabled or disabled"""
+	global oper_registry_addons
+	if not context:
+		context = bpy.context
+	if hasattr(context, "user_preferences"):  # 2.7
+		addons = context.user_preferences.addons
+	else:
+		addons = context.preferences.addons
+	enabled = frozenset(addon.module for addon in addons)
+	if enabled != oper_registry_addons:
+		reset_oper_cache()
+		oper_registry_addons = enabled
+
+
+def get_oper_cache_stats():
+	"""Report hit/miss counts of operator_exists and the snapshot size"""
+	return {
+		"hits": oper_cache_stats["hits"],
+		"misses": oper_cache_stats["misses"],
+		"submodules": len(oper_registry),
+		"operators": sum(len(opers) for opers in oper_registry.values()),
+	}
 
 
-def operator_exists(ref, refresh=True):
+def operator_exists(ref, refresh=False):
 	"""Returns true if the operator is available for use.
 
 	Sample input: import_scene.obj
+
+	Lookups go against a snapshot of bpy.ops which is only taken once per
+	submodule, and is dropped by sync_oper_cache or reset_oper_cache.
 	"""
-	global oper_cache
 	if refresh:
-		oper_cache = {}
-	if refresh is False and ref in oper_cache:
+		reset_oper_cache()
+	if ref in oper_cache:
+		oper_cache_stats["hits"] += 1
 		return oper_cache[ref]
-	if "." not in ref:
+	oper_cache_stats["misses"] += 1
+	if ref.count(".") != 1:
+		oper_cache[ref] = False
 		return False
 	base, oprs = ref.split(".")
-	res = base in dir(bpy.ops) and oprs in dir(getattr(bpy.ops, base))
+	if base not in oper_registry:
+		# Any attribute of bpy.ops is a submodule, unknown ones list nothing
+		oper_registry[base] = frozenset(dir(getattr(bpy.ops, base)))
+	res = oprs in oper_registry[base]
 	oper_cache[ref] = res
 	return res
 
@@ -129,7 +398,8 @@ class IMPORT_OT_import_any_file(bpy.types.Operator, ImportHelper):
 	"""General purpose, multi file, multi extension importer"""
 	bl_idname = "import_any.file"
 	bl_label = "Any-file importer"
-	bl_options = {'REGISTER', 'UNDO'}
+	# Undo is pushed once the queue is drained, see finish_import_queue
+	bl_options = {'REGISTER'}
 
 	files = bpy.props.CollectionProperty(type=bpy.types.PropertyGroup)
 	filter_glob = bpy.props.StringProperty(
@@ -144,6 +414,12 @@ class IMPORT_OT_import_any_file(bpy.types.Operator, ImportHelper):
 			("defaults", "Use defaults", "Use defaults for all importers"),
 		)
 	)
+	use_undo = bpy.props.BoolProperty(
+		name="Undo",
+		description=(
+			"Record the whole import as a single undo step. Disable to skip "
+			"the undo snapshot entirely, e.g. for very large imports"),
+		default=True)
 
 	directory = ''
 
@@ -153,94 +429,3097 @@ class IMPORT_OT_import_any_file(bpy.types.Operator, ImportHelper):
 		# If no extensions set, just reset to apply defaults
 		if not prefs.file_extensions:
 			bpy.ops.import_any.reset_extensions()
-		curr_exts = [ext.extension for ext in prefs.file_extensions]
+		curr_exts = get_association_index(context)
 		self.directory = os.path.dirname(self.filepath)
 
-		extensions = [os.path.splitext(imp.name)[-1][1:] for imp in self.files]
-		extensions = set(extensions)
+		if is_import_running():
+			self.report({"ERROR"}, "Another import is still in progress")
+			return {'CANCELLED'}
+
+		groups = group_files_by_extension(
+			[imp.name for imp in self.files if imp.name])
 
+		options = get_import_options(context)
+		options["undo"] = self.use_undo
+		if self.setting_mode != "defaults":
+			options["fast"] = False  # Show the importer popups instead
 		ext_missing = []
-		for ext in extensions:
-			if ext not in curr_exts:
-				ext_missing.append(ext)
+		jobs = []
+		for ext, names in groups.items():
+			if ext not in curr_exts and not has_fast_handler(ext, options):
+				ext_missing.append(ext or "(none)")
 				continue
-			import_single(
-				context, ext, self.directory, self.files, self.setting_mode)
+			jobs.extend(
+				(os.path.join(self.directory, name), ext) for name in names)
 
 		if ext_missing:
 			self.report(
 				{"WARNING"},
 				"Extensions not associated: " + ", ".join(ext_missing))
+		if jobs and (self.setting_mode != "defaults" or options["workers"] < 2):
+			queue_imports(jobs, self.setting_mode, options)
+		elif jobs:
+			remote, local = split_worker_jobs(context, jobs, options)
+			if not remote:
+				queue_imports(local, self.setting_mode, options)
+			elif options["warm"]:
+				self.report(
+					{"INFO"}, start_pool_import(context, remote, options, local))
+			else:
+				self.report(
+					{"INFO"},
+					start_sharded_import(context, remote, options, local))
 		return {'FINISHED'}
 
 
-def import_single(context, ext, directory, files, setting_mode):
-	"""Import all files of a single extension type"""
-	files = [imp.name for imp in files if imp.name.endswith(ext)]
+def split_worker_jobs(context, jobs, options):
+	"""Split jobs into those background workers can import, and the others.
+
+	Workers only hand back the objects they import, so files read into texts,
+	appended as collections or scenes, or applied to the active object are
+	imported in this session instead.
+	"""
+	remote = []
+	local = []
+	associations = get_association_index(context)
+	for filepath, ext in jobs:
+		oper = associations.get(ext, (None, None))[1]
+		if oper in LOCAL_OPERATORS or (
+				ext in LAZY_FAST_HANDLERS and has_fast_handler(ext, options)):
+			local.append((filepath, ext))
+		else:
+			remote.append((filepath, ext))
+	return remote, local
+
+
+def queue_local_jobs(state):
+	"""Queue the jobs kept from the workers of a finished import, if any"""
+	if state.get("local"):
+		queue_imports(state["local"], "defaults", state["options"])
+
+
+def is_import_running():
+	"""Whether any kind of import queue is still being processed"""
+	return bool(
+		queue_state.get("pending")
+		or shard_state.get("shards")
+		or pool_state.get("active"))
+
+
+def group_files_by_extension(files):
+	"""Map each lowercase extension (without period) to the files using it.
 
+	Single pass over the selection, so the cost stays linear in the number of
+	files regardless of how many extensions are selected.
+	"""
+	groups = {}
+	for name in files:
+		ext = os.path.splitext(name)[1][1:].lower()
+		if ext in groups:
+			groups[ext].append(name)
+		else:
+			groups[ext] = [name]
+	return groups
+
+
+def get_import_options(context=None):
+	"""Options for the import queue, from preferences where available.
+
+	undo: push a single undo step once all files are imported.
+	direct: call known python importers directly instead of via bpy.ops.
+	workers: number of background blender processes, for default settings.
+	warm: keep the background workers running between imports.
+	fast: use the built-in numpy readers of FAST_HANDLERS where available.
+	voxel_size, memory_budget: point cloud reader settings, see parse_points.
+	mdd_mode, mdd_first_frame, mdd_last_frame: mdd settings, see parse_mdd.
+	parse_processes: parse fast files ahead in this many processes.
+	tick_budget: milliseconds of main thread work per timer tick.
+	cache, cache_dir, cache_size: import cache settings, see import_single.
+	dedupe: import identical files once, see dedupe_queue.
+	share_meshes: merge identical meshes once done, see share_identical_meshes.
+	require_objects: fail files which import no objects, e.g. in workers.
+	"""
+	options = {
+		"undo": True, "direct": False, "workers": 0, "warm": False,
+		"fast": False, "voxel_size": 0.0, "memory_budget": 2048,
+		"mdd_mode": "SHAPE_KEYS", "mdd_first_frame": 0, "mdd_last_frame": 0,
+		"parse_processes": 0, "tick_budget": 20,
+		"cache": False, "cache_dir": "", "cache_size": 4096, "dedupe": False,
+		"share_meshes": False, "require_objects": False}
 	prefs = get_user_preferences(context)
-	oper = None
-	for pref_set in prefs.file_extensions:
-		if pref_set.extension != ext:
+	if prefs:
+		options["direct"] = prefs.use_direct_calls
+		options["fast"] = prefs.use_fast_handlers
+		options["workers"] = prefs.parallel_workers
+		options["warm"] = prefs.keep_workers_warm
+		options["voxel_size"] = prefs.point_voxel_size
+		options["memory_budget"] = prefs.point_memory_budget
+		options["mdd_mode"] = prefs.mdd_mode
+		options["mdd_first_frame"] = prefs.mdd_first_frame
+		options["mdd_last_frame"] = prefs.mdd_last_frame
+		options["parse_processes"] = prefs.parse_processes
+		options["tick_budget"] = prefs.tick_budget
+		options["cache"] = prefs.use_import_cache
+		options["cache_dir"] = bpy.path.abspath(prefs.cache_directory)
+		options["cache_size"] = prefs.cache_size
+		options["dedupe"] = prefs.dedupe_files
+		options["share_meshes"] = prefs.share_identical_meshes
+	return options
+
+
+def queue_imports(jobs, setting_mode, options=None, use_timer=True):
+	"""Queue files for import, drained one file at a time by a timer.
+
+	Each job is a (filepath, extension) tuple. Running one file per timer tick
+	keeps the UI responsive, and lets invoked importers finish their popup
+	before the next file is started.
+
+	Options: see get_import_options.
+	Pass use_timer=False to drain the queue yourself, see drain_import_queue.
+	"""
+	global import_queue, queue_state
+	import_queue = {}
+	pending = deque()
+	for filepath, ext in jobs:
+		if filepath in import_queue:
 			continue
-		oper = pref_set.operator
-		break
+		import_queue[filepath] = None
+		pending.append((filepath, ext))
+
+	queue_state = {
+		"pending": pending,
+		"setting_mode": setting_mode,
+		"options": options or {},
+		"start": time.time(),
+		"start_memory": get_peak_memory(),
+		"timings": {},  # route: [total seconds, files], for EXEC imports
+		"browsers": None,  # file browsers open before the first import
+		"errors": {},
+		"dispatch": {},  # extension: (operator, function, kwargs template)
+		"invoked": set(),  # extensions which had their settings popup
+		"popup": None,  # (filepath, count_data_blocks) of an open popup
+		"settings": {},  # extension: settings captured after the popup
+		"prefetch": {},  # filepath: future of its parse, see prefetch_parses
+		"hashes": {},  # filepath: content hash, see hash_file
+		"cache": {"hits": 0, "misses": 0},
+		"duplicates": {},  # filepath: identical files, see dedupe_queue
+		"instanced": 0,
+		"meshes": get_mesh_snapshot(options or {}),
+	}
+	# Like direct calls, fast readers have no popup to show for their settings
+	if setting_mode != "defaults":
+		queue_state["options"]["fast"] = False
+	# Popups for every file may change settings per file
+	if queue_state["options"].get("dedupe") and setting_mode != "file":
+		dedupe_queue()
+	if not use_timer:
+		return
+	if not bpy.app.timers.is_registered(process_import_queue):
+		bpy.app.timers.register(process_import_queue, first_interval=0.1)
+
+
+def drain_import_queue(context=None):
+	"""Import all queued files right away, blocking until done"""
+	while queue_state.get("pending"):
+		import_queue_step(context)
+	finish_import_queue(context)
+
+
+def process_import_queue():
+	"""Timer callback importing the next queued files, if not blocked"""
+	browsers = count_file_browsers()
+	if queue_state["browsers"] is None:
+		queue_state["browsers"] = browsers
+	elif browsers > queue_state["browsers"]:
+		# An invoked importer is still showing its popup, wait on the user,
+		# even after the last file so the summary and undo step include it
+		return 0.2
+	check_popup_import()
+
+	if not queue_state.get("pending"):
+		finish_import_queue()
+		return None
+
+	results = []
+
+	def next_kind():
+		if not queue_state["pending"]:
+			return None
+		if results and results[-1] and 'RUNNING_MODAL' in results[-1]:
+			return None
+		return "import " + queue_state["pending"][0][1]
+
+	run_budgeted(
+		lambda: results.append(import_queue_step()), next_kind,
+		queue_state["options"].get("tick_budget", 0))
+	report_queue_progress()
+	if results[-1] and 'RUNNING_MODAL' in results[-1]:
+		return 0.2  # give the invoked popup time to open
+	return 0.01
+
+
+def run_budgeted(step, next_kind, budget):
+	"""Run steps for up to budget milliseconds of a timer tick.
+
+	next_kind names the next step, or returns None when there is nothing
+	left to run. The running average cost of each kind of step decides if
+	the next one still fits in what is left of the budget, so cheap steps
+	are batched in one tick while slow ones run alone. At least one step
+	always runs.
+	"""
+	start = time.perf_counter()
+	kind = next_kind()
+	while kind is not None:
+		step_start = time.perf_counter()
+		step()
+		end = time.perf_counter()
+		cost = 1000.0 * (end - step_start)
+		average = step_costs.get(kind)
+		step_costs[kind] = cost if average is None else (
+			average + STEP_COST_SMOOTHING * (cost - average))
+		kind = next_kind()
+		if kind is None:
+			break
+		if 1000.0 * (end - start) + step_costs.get(kind, 0.0) > budget:
+			break
+
+
+def import_queue_step(context=None):
+	"""Import the next pending file and record its success in the queue"""
+	if not context:
+		context = bpy.context
+	filepath, ext = queue_state["pending"].popleft()
+	prefetch_parses()
+	duplicates = queue_state["duplicates"].pop(filepath, None)
+	if duplicates:
+		before = set(bpy.data.objects)
+	res = None
+	count = len(bpy.data.objects)
+	try:
+		res = import_single(
+			context, ext, filepath, queue_state["setting_mode"])
+		import_queue[filepath] = 'CANCELLED' not in res
+		if (import_queue[filepath]
+				and queue_state["options"].get("require_objects")
+				and len(bpy.data.objects) == count):
+			raise RuntimeError("No objects imported")
+	except Exception as err:
+		print("Failed to import {}: {}".format(filepath, err))
+		queue_state["errors"][filepath] = str(err)
+		import_queue[filepath] = False
+
+	if res and 'RUNNING_MODAL' in res:
+		queue_state["popup"] = (filepath, count_data_blocks())
+	if duplicates and res and 'RUNNING_MODAL' in res:
+		# Objects only exist once the popup is confirmed, import them as usual
+		queue_state["pending"].extendleft(
+			(path, ext) for path in reversed(duplicates))
+	elif duplicates and import_queue[filepath]:
+		copy_duplicates(context, before, duplicates)
+	elif duplicates:
+		for path in duplicates:
+			import_queue[path] = False
+	return res
+
+
+def check_popup_import():
+	"""Mark the last invoked file failed if its closed popup added nothing"""
+	popup = queue_state.get("popup")
+	if not popup:
+		return
+	queue_state["popup"] = None
+	filepath, count = popup
+	if count_data_blocks() == count:
+		print("Import of {} was cancelled".format(filepath))
+		import_queue[filepath] = False
+
+
+def get_file_hash(filepath):
+	"""Sha256 of a file's content, None if it can't be read"""
+	digest = hashlib.sha256()
+	try:
+		with open(filepath, "rb") as fd:
+			for block in iter(lambda: fd.read(1024 * 1024), b""):
+				digest.update(block)
+	except OSError:
+		return None
+	return digest.hexdigest()
+
+
+def dedupe_queue():
+	"""Keep only the first of each set of identical files pending.
+
+	Files can only be identical with the same extension and size, so only
+	those are hashed, in parallel. The other files are recorded as the
+	duplicates of the first, see copy_duplicates.
+	"""
+	pending = list(queue_state["pending"])
+	groups = {}
+	for job, size in zip(
+			pending, get_file_sizes([path for path, _ in pending])):
+		if size:
+			groups.setdefault((job[1], size), []).append(job[0])
+	candidates = [
+		path for paths in groups.values() if len(paths) > 1 for path in paths]
+	if not candidates:
+		return
+	hashes = queue_state["hashes"]
+	with ThreadPoolExecutor(max_workers=min(32, len(candidates))) as executor:
+		hashes.update(zip(candidates, executor.map(get_file_hash, candidates)))
+
+	firsts = {}
+	kept = deque()
+	for path, ext in pending:
+		digest = hashes.get(path)
+		first = firsts.setdefault((digest, ext), path) if digest else path
+		if first == path:
+			kept.append((path, ext))
+		else:
+			queue_state["duplicates"].setdefault(first, []).append(path)
+	queue_state["pending"] = kept
+
 
+def copy_duplicates(context, before, duplicates):
+	"""Add linked duplicates of the objects just imported, per duplicate file.
+
+	Copies share the object data of the originals. Parents and modifier
+	objects (e.g. armatures) are remapped to the copies.
+	"""
+	imported = [obj for obj in bpy.data.objects if obj not in before]
+	for path in duplicates:
+		copies = {obj: obj.copy() for obj in imported}
+		for obj, copy in copies.items():
+			if obj.parent in copies:
+				copy.parent = copies[obj.parent]
+			for modifier in copy.modifiers:
+				if getattr(modifier, "object", None) in copies:
+					modifier.object = copies[modifier.object]
+			for collection in obj.users_collection or [
+					get_import_collection(context)]:
+				collection.objects.link(copy)
+			copy.select_set(True)
+		import_queue[path] = True
+		queue_state["instanced"] += 1
+
+
+def report_queue_progress(context=None):
+	"""Show queue depth and throughput in the status bar"""
+	total = len(import_queue)
+	depth = len(queue_state["pending"])
+	elapsed = time.time() - queue_state["start"]
+	rate = (total - depth) / elapsed if elapsed > 0 else 0.0
+	set_status_text(
+		"Importing files: {}/{} done, {} queued, {:.1f} files/s".format(
+			total - depth, total, depth, rate),
+		context)
+
+
+def finish_import_queue(context=None):
+	"""Push the batch undo step, summarize and reset the status bar"""
+	use_undo = queue_state["options"].get("undo", False)
+	imported = [path for path, success in import_queue.items() if success]
+	if queue_state["meshes"] is not None:
+		share_identical_meshes(queue_state["meshes"])
+	if use_undo and imported:
+		push_undo_step("Import {} files".format(len(imported)), context)
+
+	failed = [path for path, success in import_queue.items() if not success]
+	elapsed = time.time() - queue_state["start"]
+	print("Imported {} files in {:.2f}s, {} failed (undo {})".format(
+		len(imported), elapsed, len(failed), "on" if use_undo else "off"))
+	start_memory = queue_state["start_memory"]
+	end_memory = get_peak_memory()
+	if start_memory is not None and end_memory is not None:
+		print("\tPeak memory {:.1f}MB, {:+.1f}MB during import".format(
+			end_memory, end_memory - start_memory))
+	for route, (seconds, count) in sorted(queue_state["timings"].items()):
+		print("\t{}: {:.1f}ms per file over {} files".format(
+			route, 1000.0 * seconds / count, count))
+	if queue_state["options"].get("cache"):
+		print("\tCache: {hits} hits, {misses} misses".format(
+			**queue_state["cache"]))
+	if queue_state["instanced"]:
+		print("\tIdentical files instanced: {}".format(
+			queue_state["instanced"]))
+	for path in failed:
+		print("\tFailed: " + path)
+	for future in queue_state["prefetch"].values():
+		discard_prefetched(future)
+	queue_state["prefetch"] = {}
+	shutdown_parse_pool()
+	queue_state["pending"] = None
+	set_status_text(None, context)
+
+
+def get_mesh_snapshot(options):
+	"""Meshes existing before an import, if identical ones are to be shared"""
+	if not options.get("share_meshes"):
+		return None
+	return set(bpy.data.meshes)
+
+
+# Attribute data type to (foreach_get property, dtype, values per element)
+MESH_ATTRIBUTE_ARRAYS = {
+	"FLOAT": ("value", np.float32, 1),
+	"INT": ("value", np.int32, 1),
+	"INT8": ("value", np.int8, 1),
+	"BOOLEAN": ("value", bool, 1),
+	"FLOAT2": ("vector", np.float32, 2),
+	"INT32_2D": ("value", np.int32, 2),
+	"FLOAT_VECTOR": ("vector", np.float32, 3),
+	"FLOAT_COLOR": ("color", np.float32, 4),
+	"BYTE_COLOR": ("color", np.float32, 4),
+	"QUATERNION": ("value", np.float32, 4),
+	"FLOAT4X4": ("value", np.float32, 16),
+}
+
+
+def mesh_fingerprint(mesh):
+	"""Digest of a mesh's geometry, attributes and materials, None to skip.
+
+	Arrays are read with foreach_get and hashed as raw bytes, so even large
+	meshes are compared without python objects per element. This covers
+	edges, uvs, color and other generic attributes, and custom split normals.
+	Meshes with shape keys are not shared, as their keys may be animated
+	differently, nor meshes with attributes of types that can't be read so.
+	"""
+	if mesh.shape_keys:
+		return None
+	digest = hashlib.blake2b(digest_size=16)
+	counts = (
+		len(mesh.vertices), len(mesh.edges), len(mesh.loops),
+		len(mesh.polygons))
+	digest.update(np.array(counts, dtype=np.int64).tobytes())
+	for collection, prop, dtype, width in (
+			(mesh.vertices, "co", np.float32, 3),
+			(mesh.edges, "vertices", np.int32, 2),
+			(mesh.edges, "use_seam", bool, 1),
+			(mesh.edges, "use_edge_sharp", bool, 1),
+			(mesh.loops, "vertex_index", np.int32, 1),
+			(mesh.polygons, "loop_total", np.int32, 1),
+			(mesh.polygons, "material_index", np.int32, 1),
+			(mesh.polygons, "use_smooth", bool, 1)):
+		values = np.empty(len(collection) * width, dtype=dtype)
+		collection.foreach_get(prop, values)
+		digest.update(values.tobytes())
+	for layer in mesh.uv_layers:
+		values = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+		layer.data.foreach_get("uv", values)
+		digest.update(layer.name.encode("utf-8"))
+		digest.update(values.tobytes())
+
+	if not hasattr(mesh, "attributes"):  # Before 2.91
+		if mesh.vertex_colors:
+			return None
+	else:
+		for attr in mesh.attributes:
+			if attr.name.startswith("."):
+				continue  # Selection, hiding and topology hashed above
+			array = MESH_ATTRIBUTE_ARRAYS.get(attr.data_type)
+			if not array:
+				return None
+			prop, dtype, width = array
+			values = np.empty(len(attr.data) * width, dtype=dtype)
+			attr.data.foreach_get(prop, values)
+			digest.update("{}:{}:{}".format(
+				attr.name, attr.domain, attr.data_type).encode("utf-8"))
+			digest.update(values.tobytes())
+
+	if getattr(mesh, "has_custom_normals", False):
+		values = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+		if hasattr(mesh, "corner_normals"):  # 4.1+
+			mesh.corner_normals.foreach_get("vector", values)
+		else:
+			mesh.calc_normals_split()
+			mesh.loops.foreach_get("normal", values)
+		digest.update(b"custom normals")
+		digest.update(values.tobytes())
+
+	names = [material.name if material else "" for material in mesh.materials]
+	digest.update(json.dumps(names).encode("utf-8"))
+	return digest.digest()
+
+
+def estimate_mesh_bytes(mesh):
+	"""Rough memory used by a mesh's main arrays, in bytes"""
+	loops = len(mesh.loops)
+	return (
+		len(mesh.vertices) * 12  # positions
+		+ len(mesh.edges) * 8  # vertex pairs
+		+ loops * 8  # vertex and edge per corner
+		+ len(mesh.polygons) * 12  # offsets, material and flags
+		+ len(mesh.uv_layers) * loops * 8)
+
+
+def share_identical_meshes(before):
+	"""Point objects using identical new meshes to one of them.
+
+	Meshes created since the before snapshot, without vertex groups on any
+	object using them, are grouped by fingerprint. The first of each group
+	replaces the others everywhere (user_remap), which are then removed.
+	Prints how much memory was roughly reclaimed.
+	"""
+	# Deform weights are stored per mesh but named by each object's vertex
+	# groups, and are only readable one vertex at a time, so leave those be
+	weighted = set(
+		obj.data for obj in bpy.data.objects
+		if obj.type == 'MESH' and obj.vertex_groups)
+	canonical = {}
+	duplicates = []
+	for mesh in bpy.data.meshes:
+		if mesh in before or not mesh.users or mesh in weighted:
+			continue
+		fingerprint = mesh_fingerprint(mesh)
+		if fingerprint is None:
+			continue
+		if fingerprint in canonical:
+			duplicates.append((mesh, canonical[fingerprint]))
+		else:
+			canonical[fingerprint] = mesh
+	if not duplicates:
+		return
+	reclaimed = 0
+	for mesh, shared in duplicates:
+		reclaimed += estimate_mesh_bytes(mesh)
+		mesh.user_remap(shared)
+	removed = [mesh for mesh, _ in duplicates]
+	if hasattr(bpy.data, "batch_remove"):  # 2.8+
+		bpy.data.batch_remove(removed)
+	else:
+		for mesh in removed:
+			bpy.data.meshes.remove(mesh)
+	print("\tShared {} identical meshes, about {:.1f}MB reclaimed".format(
+		len(removed), reclaimed / (1024.0 * 1024.0)))
+
+
+def push_undo_step(message, context=None):
+	"""Push a single undo step covering everything imported since the last"""
+	if bpy.app.background:
+		return
+	call_with_override(
+		bpy.ops.ed.undo_push, get_context_override(context), message=message)
+
+
+def get_peak_memory():
+	"""Peak resident memory of this process in MB, None if unavailable"""
+	try:
+		import resource
+	except ImportError:  # Windows
+		return None
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	if sys.platform == "darwin":
+		return peak / (1024.0 * 1024.0)  # bytes on macOS
+	return peak / 1024.0  # kilobytes elsewhere
+
+
+def get_file_sizes(paths):
+	"""Stat all files concurrently, returns sizes with 0 for missing files"""
+	def get_size(path):
+		try:
+			return os.path.getsize(path)
+		except OSError:
+			return 0
+	if not paths:
+		return []
+	with ThreadPoolExecutor(max_workers=min(32, len(paths))) as executor:
+		return list(executor.map(get_size, paths))
+
+
+def estimate_costs(jobs):
+	"""Estimated import cost of each (filepath, extension) job"""
+	sizes = get_file_sizes([filepath for filepath, _ in jobs])
+	return [
+		FILE_COST + size * EXTENSION_COSTS.get(ext, 1.0)
+		for (_, ext), size in zip(jobs, sizes)]
+
+
+def plan_shards(jobs, count, costs=None):
+	"""Split jobs into up to count shards of balanced estimated cost.
+
+	Assigns the most expensive job first to the least loaded shard (longest
+	processing time first). Returns the shards, the predicted makespan (cost
+	of the largest shard) and the total cost, in estimated bytes.
+	"""
+	if costs is None:
+		costs = estimate_costs(jobs)
+	loads = [(0.0, i) for i in range(count)]
+	shards = [[] for _ in range(count)]
+	for j in sorted(range(len(jobs)), key=lambda j: -costs[j]):
+		load, i = heapq.heappop(loads)
+		shards[i].append(jobs[j])
+		heapq.heappush(loads, (load + costs[j], i))
+	makespan = max(load for load, _ in loads) if loads else 0.0
+	return [shard for shard in shards if shard], makespan, sum(costs)
+
+
+def report_plan(makespan, total, count):
+	"""Describe the predicted makespan of a parallel import"""
+	return (
+		"Predicted makespan of {:.1f}MB-equivalent over {} workers, "
+		"{:.1f}MB-equivalent in total (~{:.1f}x speedup)").format(
+			makespan / 1e6, count, total / 1e6,
+			total / makespan if makespan else 1.0)
+
+
+def start_sharded_import(context, jobs, options, local=None):
+	"""Import the jobs in parallel, across background blender processes.
+
+	Each worker runs this file from the command line on its shard, using the
+	same associations, and saves only what it imported to a blend file. The
+	results get appended to this session once all workers are done, then the
+	local jobs are queued here, see split_worker_jobs.
+
+	Returns a description of the predicted makespan.
+	"""
+	global import_queue, shard_state
+	import_queue = {filepath: None for filepath, _ in jobs}
+	tempdir = tempfile.mkdtemp(prefix="aardvark_")
+	assoc = [
+		"--assoc={}={}".format(ext, oper)
+		for ext, (_, oper) in get_association_index(context).items() if oper]
+
+	planned, makespan, total = plan_shards(jobs, options["workers"])
+	plan = report_plan(makespan, total, len(planned))
+	print(plan)
+	shards = []
+	for i, shard in enumerate(planned):
+		base = os.path.join(tempdir, "shard_{}".format(i))
+		paths = [filepath for filepath, _ in shard]
+		with open(base + ".txt", "w") as fd:
+			fd.write("\n".join(paths))
+		cmd = [
+			bpy.app.binary_path, "--background",
+			"--python", os.path.abspath(__file__), "--",
+			"--paths-file", base + ".txt",
+			"--out", base + ".blend", "--only-imported",
+			"--report", base + ".json"] + assoc
+		if options.get("direct"):
+			cmd.append("--direct")
+		if options.get("fast"):
+			cmd.append("--fast")
+			cmd.extend([
+				"--voxel-size", str(options["voxel_size"]),
+				"--memory-budget", str(options["memory_budget"])])
+		with open(base + ".log", "w") as log:
+			proc = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT)
+		shards.append({"process": proc, "base": base, "paths": paths})
+
+	print("Importing {} files in {} background workers, logs in {}".format(
+		len(jobs), len(shards), tempdir))
+	shard_state = {
+		"shards": shards,
+		"tempdir": tempdir,
+		"options": options,
+		"start": time.time(),
+		"meshes": get_mesh_snapshot(options),
+		"local": local or [],
+	}
+	if not bpy.app.timers.is_registered(process_sharded_import):
+		bpy.app.timers.register(process_sharded_import, first_interval=0.5)
+	return plan
+
+
+def process_sharded_import():
+	"""Timer callback waiting on the workers, then loading their results"""
+	shards = shard_state.get("shards")
+	if not shards:
+		return None
+	running = [shard for shard in shards if shard["process"].poll() is None]
+	if running:
+		set_status_text("Importing in background workers: {}/{} done".format(
+			len(shards) - len(running), len(shards)))
+		return 0.5
+	finish_sharded_import()
+	return None
+
+
+def finish_sharded_import(context=None):
+	"""Append the objects imported by each worker, and record success"""
+	if not context:
+		context = bpy.context
+	collection = get_import_collection(context)
+	objects = []
+	for shard in shard_state["shards"]:
+		try:
+			objects.extend(load_shard_result(shard, collection))
+		except Exception as err:  # e.g. a truncated report or blend file
+			print("Could not load worker results, see log {}: {}".format(
+				shard["base"] + ".log", err))
+			for path in shard["paths"]:
+				import_queue[path] = False
+
+	imported = [path for path, success in import_queue.items() if success]
+	if shard_state["meshes"] is not None:
+		share_identical_meshes(shard_state["meshes"])
+	if imported and shard_state["options"].get("undo"):
+		push_undo_step("Import {} files".format(len(imported)), context)
+	print("Imported {} files ({} objects) in {:.2f}s, {} failed".format(
+		len(imported), len(objects), time.time() - shard_state["start"],
+		len(import_queue) - len(imported)))
+	for path, success in import_queue.items():
+		if not success:
+			print("\tFailed: " + path)
+
+	shutil.rmtree(shard_state["tempdir"], ignore_errors=True)
+	shard_state["shards"] = None
+	set_status_text(None, context)
+	queue_local_jobs(shard_state)
+
+
+def load_shard_result(shard, collection):
+	"""Record the success of a worker's files and append its objects"""
+	report = {}
+	if os.path.isfile(shard["base"] + ".json"):
+		with open(shard["base"] + ".json") as fd:
+			report = json.load(fd)
+	for path in shard["paths"]:
+		import_queue[path] = bool(report.get(path))
+	if shard["process"].returncode not in (0, 1):
+		print("Worker failed, see log: " + shard["base"] + ".log")
+		return []
+	if os.path.isfile(shard["base"] + ".blend"):
+		return load_blend_objects(shard["base"] + ".blend", collection)
+	return []
+
+
+def get_import_collection(context):
+	"""Collection to link imported objects to, also from timers"""
+	collection = getattr(context, "collection", None)
+	if not collection:
+		collection = context.scene.collection
+	return collection
+
+
+def load_blend_objects(filepath, collection):
+	"""Append all objects of a blend file, linking them to the collection"""
+	with bpy.data.libraries.load(filepath, link=False) as (data_from, data_to):
+		data_to.objects = data_from.objects
+	objects = [obj for obj in data_to.objects if obj is not None]
+	for obj in objects:
+		collection.objects.link(obj)
+	return objects
+
+
+class ImportWorkerPool:
+	"""Background blender processes which are kept running to take imports.
+
+	Jobs and results are exchanged as json lines over each worker's stdin and
+	stdout, so blender's startup cost is only paid once per worker.
+	"""
+
+	def __init__(self):
+		self.workers = []
+		self.results = queue.Queue()
+
+	def resize(self, count):
+		"""Start or stop workers so that count of them are running"""
+		self.workers = [
+			worker for worker in self.workers
+			if worker["process"].poll() is None]
+		while len(self.workers) > count:
+			self.stop_worker(self.workers.pop())
+		while len(self.workers) < count:
+			proc = subprocess.Popen(
+				[
+					bpy.app.binary_path, "--background",
+					"--python", os.path.abspath(__file__), "--", "--worker"],
+				stdin=subprocess.PIPE,
+				stdout=subprocess.PIPE,
+				stderr=subprocess.DEVNULL,
+				universal_newlines=True,
+				bufsize=1)
+			worker = {"process": proc, "job": None, "ready": False}
+			reader = threading.Thread(
+				target=self.read_results, args=(worker,), daemon=True)
+			reader.start()
+			self.workers.append(worker)
+
+	def read_results(self, worker):
+		"""Reader thread, forwarding the results of one worker"""
+		for line in worker["process"].stdout:
+			if line.startswith(WORKER_PREFIX):
+				result = json.loads(line[len(WORKER_PREFIX):])
+				self.results.put((worker, result))
+		self.results.put((worker, None))  # worker exited
+
+	def submit(self, worker, job):
+		"""Send a job to an idle worker"""
+		worker["job"] = job
+		worker["process"].stdin.write(json.dumps(job) + "\n")
+		worker["process"].stdin.flush()
+
+	def idle_workers(self):
+		"""Workers which are started up and waiting on a job"""
+		return [
+			worker for worker in self.workers
+			if worker["ready"] and worker["job"] is None
+			and worker["process"].poll() is None]
+
+	def busy_workers(self):
+		"""Workers running a job"""
+		return [worker for worker in self.workers if worker["job"]]
+
+	def alive_workers(self):
+		"""Workers whose process has not exited"""
+		return [
+			worker for worker in self.workers
+			if worker["process"].poll() is None]
+
+	def poll(self):
+		"""Return (job, result) pairs finished since the last poll"""
+		finished = []
+		while True:
+			try:
+				worker, result = self.results.get_nowait()
+			except queue.Empty:
+				break
+			if result is None:
+				if worker["job"]:
+					error = {"success": False, "error": "Worker exited"}
+					finished.append((worker["job"], error))
+				worker["job"] = None
+			elif result.get("ready"):
+				worker["ready"] = True
+			else:
+				finished.append((worker["job"], result))
+				worker["job"] = None
+		return finished
+
+	def stop_worker(self, worker):
+		"""Let a worker exit, killing it if it is busy"""
+		try:
+			worker["process"].stdin.close()  # worker exits at end of input
+		except OSError:
+			pass
+		if worker["job"]:
+			worker["process"].kill()
+
+	def shutdown(self):
+		"""Stop all workers, e.g. when the add-on is disabled"""
+		for worker in self.workers:
+			self.stop_worker(worker)
+		self.workers = []
+
+
+def start_pool_import(context, jobs, options, local=None):
+	"""Import the jobs through the warm worker pool, started if needed.
+
+	The local jobs are queued here once the pool is done, see
+	split_worker_jobs.
+
+	Returns a description of the predicted makespan.
+	"""
+	global import_queue, pool_state, worker_pool
+	if worker_pool is None:
+		worker_pool = ImportWorkerPool()
+	worker_pool.resize(options["workers"])
+	import_queue = {filepath: None for filepath, _ in jobs}
+
+	# Workers take the next job once idle, so handing out the most expensive
+	# jobs first gives the same longest processing time first schedule.
+	costs = estimate_costs(jobs)
+	planned, makespan, total = plan_shards(jobs, options["workers"], costs)
+	plan = report_plan(makespan, total, len(planned))
+	print(plan)
+	order = sorted(range(len(jobs)), key=lambda j: -costs[j])
+	pool_state = {
+		"active": True,
+		"pending": deque(jobs[j] for j in order),
+		"results": deque(),  # (job, result) not yet loaded in this session
+		"meshes": get_mesh_snapshot(options),
+		"tempdir": tempfile.mkdtemp(prefix="aardvark_"),
+		"options": options,
+		"start": time.time(),
+		"objects": 0,
+		"count": 0,
+		"templates": {},  # extension: (operator, kwargs template)
+		"local": local or [],
+	}
+	if not bpy.app.timers.is_registered(process_pool_import):
+		bpy.app.timers.register(process_pool_import, first_interval=0.1)
+	return plan
+
+
+def make_pool_job(context, filepath, ext):
+	"""Resolve operator and kwargs here, for a worker to run as is"""
+	templates = pool_state["templates"]
+	if ext not in templates:
+		oper = get_association_index(context).get(ext, (None, None))[1]
+		template = get_kwargs_template(context, oper) if oper else None
+		templates[ext] = (oper, template)
+	oper, template = templates[ext]
+	directory, name = os.path.split(filepath)
+	pool_state["count"] += 1
+	return {
+		"id": pool_state["count"],
+		"filepath": filepath,
+		"fast": ext if has_fast_handler(ext, pool_state["options"]) else None,
+		"fast_settings": get_fast_settings(ext, pool_state["options"]),
+		"operator": oper,
+		"calls": get_kwargs(template, directory, [name]) if oper else [],
+		"out": os.path.join(
+			pool_state["tempdir"], "job_{}.blend".format(pool_state["count"])),
+	}
+
+
+def process_pool_import():
+	"""Timer callback handing jobs to idle workers and loading results"""
+	if not pool_state.get("active"):
+		return None
+	context = bpy.context
+	collection = get_import_collection(context)
+	results = pool_state["results"]
+	results.extend(worker_pool.poll())
+
+	def load_result():
+		job, result = results.popleft()
+		import_queue[job["filepath"]] = bool(result.get("success"))
+		if result.get("error"):
+			print("Failed to import {}: {}".format(
+				job["filepath"], result["error"]))
+		try:
+			if os.path.isfile(job["out"]):
+				pool_state["objects"] += len(
+					load_blend_objects(job["out"], collection))
+		except Exception as err:  # e.g. a truncated blend file
+			print("Could not load the result of {}: {}".format(
+				job["filepath"], err))
+			import_queue[job["filepath"]] = False
+		finally:
+			if os.path.isfile(job["out"]):
+				os.remove(job["out"])
+
+	if results:
+		run_budgeted(
+			load_result, lambda: "pool result" if results else None,
+			pool_state["options"].get("tick_budget", 0))
+
+	pending = pool_state["pending"]
+	for worker in worker_pool.idle_workers():
+		if not pending:
+			break
+		filepath, ext = pending.popleft()
+		worker_pool.submit(worker, make_pool_job(context, filepath, ext))
+
+	if pending and not worker_pool.alive_workers():
+		print("No background workers left running")
+		pending.clear()
+	if pending or results or worker_pool.busy_workers():
+		done = sum(1 for success in import_queue.values() if success is not None)
+		set_status_text("Importing in background workers: {}/{} done".format(
+			done, len(import_queue)))
+		return 0.01 if results else 0.1
+	finish_pool_import(context)
+	return None
+
+
+def finish_pool_import(context=None):
+	"""Push the batch undo step and summarize the pool import"""
+	imported = [path for path, success in import_queue.items() if success]
+	if pool_state["meshes"] is not None:
+		share_identical_meshes(pool_state["meshes"])
+	if imported and pool_state["options"].get("undo"):
+		push_undo_step("Import {} files".format(len(imported)), context)
+	print("Imported {} files ({} objects) in {:.2f}s, {} failed".format(
+		len(imported), pool_state["objects"], time.time() - pool_state["start"],
+		len(import_queue) - len(imported)))
+	for path, success in import_queue.items():
+		if not success:
+			print("\tFailed: " + path)
+	shutil.rmtree(pool_state["tempdir"], ignore_errors=True)
+	pool_state["active"] = False
+	set_status_text(None, context)
+	queue_local_jobs(pool_state)
+
+
+def import_single(context, ext, filepath, setting_mode):
+	"""Import a single file, or load it from the import cache.
+
+	With the cache enabled, the objects an import creates are saved to a
+	blend file named by get_cache_key. Later imports of the same content
+	with the same settings append those objects instead of importing again.
+	"""
+	key = None
+	if queue_state["options"].get("cache"):
+		key = get_cache_key(context, ext, filepath, setting_mode)
+	if key:
+		start = time.time()
+		if load_cached_import(context, key):
+			queue_state["cache"]["hits"] += 1
+			record_timing("cache", start)
+			return {'FINISHED'}
+		queue_state["cache"]["misses"] += 1
+		before = set(bpy.data.objects)
+
+	res = import_file(context, ext, filepath, setting_mode)
+	if key and 'CANCELLED' not in res:
+		imported = [obj for obj in bpy.data.objects if obj not in before]
+		if imported:
+			try:
+				save_cached_import(key, imported)
+			except (OSError, RuntimeError) as err:
+				# The objects are imported all the same, only not cached
+				print("Could not cache the import of {}: {}".format(
+					filepath, err))
+	return res
+
+
+def import_file(context, ext, filepath, setting_mode):
+	"""Import a single file, using the operator associated to its extension"""
+	directory, name = os.path.split(filepath)
+	override = get_context_override(context)
+
+	if has_fast_handler(ext, queue_state["options"]):
+		start = time.time()
+		future = queue_state["prefetch"].pop(filepath, None)
+		if future:
+			try:
+				future.result()
+			except FastPathUnsupported:
+				pass  # Raised again by import_prefetched below
+			except Exception as err:  # e.g. BrokenProcessPool
+				stop_prefetching(err)
+				future = None
+		try:
+			if future:
+				res = call_direct(
+					import_prefetched, override, filepath, future)
+			else:
+				res = call_direct(
+					import_fast, override, filepath,
+					get_fast_settings(ext, queue_state["options"]))
+		except FastPathUnsupported as err:
+			if ext not in get_association_index(context):
+				raise RuntimeError(
+					"Fast import unsupported and no operator associated "
+					"with .{}: {}".format(ext, err))
+			print("Fast import unsupported for {}, using operator: {}".format(
+				filepath, err))
+		else:
+			record_timing("fast prefetched" if future else "fast", start)
+			return res
+
+	oper, oper_func, template = resolve_dispatch(context, ext)
+	loader = None
+	if setting_mode == "defaults" and queue_state["options"].get("direct"):
+		loader = DIRECT_LOADERS.get(oper)
+	if loader:
+		module_name, function_name, loader = loader
+		try:
+			load = getattr(
+				importlib.import_module(module_name), function_name)
+		except (ImportError, AttributeError) as err:
+			# Importer add-on disabled, or its module API differs
+			print("Direct import unavailable for {}, using bpy.ops: {}".format(
+				oper, err))
+		else:
+			# Errors from here on are the import's, not worth a second try
+			start = time.time()
+			res = call_direct(loader, override, filepath, load)
+			record_timing("direct", start)
+			return res
+
+	# Undo pushes are suppressed per file (False), the queue pushes one step
+	# for the batch. Invoked popups still push their own step once confirmed.
+	settings = {}
 	if setting_mode == "defaults":
 		args = ['EXEC_DEFAULT']
+	elif setting_mode == "extension" and ext in queue_state["invoked"]:
+		# The popup for the first file of this extension has been confirmed
+		# (the queue waits on it), so reuse those settings for the rest.
+		if ext not in queue_state["settings"]:
+			queue_state["settings"][ext] = get_operator_settings(context, oper)
+		settings = queue_state["settings"][ext]
+		args = ['EXEC_DEFAULT']
 	else:
+		queue_state["invoked"].add(ext)
 		args = ['INVOKE_DEFAULT']
-	kwargs = get_kwargs(context, oper, directory, files)
 
 	# print("Operator found: "+str(oper))
 	# print("Apply these args:", args)
-	# print("Apply these kwargs:", kwargs)
-
-	# Apply to the operator itself, and call
-	base, oprs = oper.split(".")
-	oper_func = getattr(getattr(bpy.ops, base), oprs)
 
 	# May invoke popup, modal likely lasts past this operator's execution.
 	# Pass both invoke and parameter values.
-	oper_func(*args, **kwargs)
+	start = time.time()
+	res = set()
+	for kwargs in get_kwargs(template, directory, [name]):
+		kwargs = dict(settings, **kwargs)
+		res |= call_with_override(
+			oper_func, override, *args, False, **kwargs)
+	if args[0] == 'EXEC_DEFAULT':
+		record_timing("bpy.ops", start)
+	return res
+
+
+def hash_file(filepath):
+	"""Sha256 of a file's content, remembered for the queue"""
+	hashes = queue_state.setdefault("hashes", {})
+	if not hashes.get(filepath):
+		hashes[filepath] = get_file_hash(filepath)
+		if not hashes[filepath]:
+			raise OSError("Could not read " + filepath)
+	return hashes[filepath]
+
+
+# Statements of mtl files which reference texture files
+OBJ_TEXTURE_KEYWORDS = (
+	b"map_Ka", b"map_Kd", b"map_Ks", b"map_Ke", b"map_Ns", b"map_d",
+	b"map_Bump", b"map_bump", b"bump", b"disp", b"decal", b"refl", b"norm",
+	b"map_Pr", b"map_Pm", b"map_Ps")
+
+
+def get_side_files(ext, filepath):
+	"""Files referenced by a file, which its import also reads.
+
+	Covers the buffers and images of gltf and glb files, and the material
+	libraries of obj files with their textures. Paths may not exist.
+	"""
+	directory = os.path.dirname(filepath)
+	paths = []
+	if ext in ("glb", "gltf"):
+		try:
+			gltf, _ = read_gltf_json(filepath)
+		except (FastPathUnsupported, OSError, ValueError):
+			return paths  # The import will fail on it anyway
+		for item in gltf.get("buffers", []) + gltf.get("images", []):
+			uri = item.get("uri")
+			if uri and not uri.startswith("data:"):
+				paths.append(os.path.join(directory, unquote(uri)))
+	elif ext == "obj":
+		for mtl in find_file_references(filepath, (b"mtllib",), directory):
+			paths.append(mtl)
+			paths.extend(find_file_references(
+				mtl, OBJ_TEXTURE_KEYWORDS, os.path.dirname(mtl)))
+	return paths
+
+
+def find_file_references(filepath, keywords, directory):
+	"""Paths given by the lines starting with one of keywords in a text file.
+
+	Read in chunks and matched with a regex, as these lines may be anywhere
+	in large obj files. The file name is the rest of the line if that
+	exists, else each of its words which exist (mtllib may list several),
+	else its last word as statements may have options before it.
+	"""
+	pattern = re.compile(
+		rb"^[ \t]*(?:" + b"|".join(keywords) + rb")[ \t]+(.+?)[ \t\r]*$",
+		re.MULTILINE)
+	paths = []
+	tail = b""
+	try:
+		with open(filepath, "rb") as fd:
+			for block in iter(lambda: fd.read(OBJ_CHUNK_SIZE), b""):
+				block = tail + block
+				end = block.rfind(b"\n") + 1
+				tail = block[end:]
+				for match in pattern.finditer(block, 0, end):
+					paths.append(match.group(1))
+			for match in pattern.finditer(tail):
+				paths.append(match.group(1))
+	except OSError:
+		return []
+	found = []
+	for value in paths:
+		value = value.decode("utf-8", "replace")
+		names = [value]
+		if not os.path.isfile(os.path.join(directory, value)):
+			words = value.split()
+			names = [
+				word for word in words
+				if os.path.isfile(os.path.join(directory, word))] or words[-1:]
+		for name in names:
+			path = os.path.join(directory, name)
+			if path not in found:
+				found.append(path)
+	return found
+
+
+def get_cache_key(context, ext, filepath, setting_mode):
+	"""Key of an import in the cache, None if its settings aren't known yet.
+
+	Combines the file content hash with the route (operator, or fast reader
+	as aardvark.<ext>) and its kwargs without the file paths, plus blender's
+	version as cached blend files are not read by older versions. Files it
+	references (see get_side_files) are hashed too, or marked missing.
+	"""
+	options = queue_state["options"]
+	if has_fast_handler(ext, options):
+		route = "aardvark." + ext
+		calls = [get_fast_settings(ext, options)]
+	else:
+		oper, _, template = resolve_dispatch(context, ext)
+		if not oper:
+			return None
+		if setting_mode == "defaults":
+			settings = {}
+		elif setting_mode == "extension" and ext in queue_state["invoked"]:
+			if ext not in queue_state["settings"]:
+				queue_state["settings"][ext] = get_operator_settings(
+					context, oper)
+			settings = queue_state["settings"][ext]
+		else:
+			return None  # Settings come from the popup
+		directory, name = os.path.split(filepath)
+		route = oper
+		calls = [
+			{key: value for key, value in dict(settings, **kwargs).items()
+				if key not in ("filepath", "directory", "files")}
+			for kwargs in get_kwargs(template, directory, [name])]
+	# Their paths are in the content of the file or material library hashed
+	side_files = [
+		hash_file(path) if os.path.isfile(path) else None
+		for path in get_side_files(ext, filepath)]
+	description = json.dumps(
+		[bpy.app.version_string, ext, route, calls, side_files],
+		sort_keys=True, default=str)
+	return hashlib.sha256(
+		(hash_file(filepath) + description).encode("utf-8")).hexdigest()
+
+
+def get_cache_path(key):
+	"""Blend file of a cache key, in the cache directory"""
+	directory = queue_state["options"].get("cache_dir") or os.path.join(
+		tempfile.gettempdir(), "aardvark_cache")
+	return os.path.join(directory, key + ".blend")
+
+
+def load_cached_import(context, key):
+	"""Append the objects cached for a key, returns False if not cached"""
+	path = get_cache_path(key)
+	if not os.path.isfile(path):
+		return False
+	os.utime(path)  # Most recently used, for evict_import_cache
+	for obj in load_blend_objects(path, get_import_collection(context)):
+		obj.select_set(True)
+	return True
+
+
+def save_cached_import(key, objects):
+	"""Write imported objects (and their data) to the cache, then evict"""
+	path = get_cache_path(key)
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	# Write aside and rename, so a partial file is never loaded
+	temp_path = path + ".tmp.blend"
+	try:
+		bpy.data.libraries.write(
+			temp_path, set(objects), path_remap='ABSOLUTE')
+		os.replace(temp_path, path)
+	except (OSError, RuntimeError):
+		if os.path.exists(temp_path):
+			os.remove(temp_path)
+		raise
+	evict_import_cache(
+		os.path.dirname(path),
+		queue_state["options"].get("cache_size", 4096) * 1024 * 1024)
+
+
+def evict_import_cache(directory, limit):
+	"""Remove the least recently used cache files until under limit bytes"""
+	entries = []
+	for entry in os.scandir(directory):
+		if entry.is_file() and entry.name.endswith(".blend"):
+			stat = entry.stat()
+			entries.append((stat.st_mtime, stat.st_size, entry.path))
+	total = sum(size for _, size, _ in entries)
+	for _, size, path in sorted(entries):
+		if total <= limit:
+			break
+		try:
+			os.remove(path)
+		except OSError:
+			continue
+		total -= size
+
+
+def record_timing(route, start):
+	"""Accumulate time spent per import route, reported with the summary"""
+	timing = queue_state["timings"].setdefault(route, [0.0, 0])
+	timing[0] += time.time() - start
+	timing[1] += 1
+
+
+def call_direct(loader, override, filepath, *args):
+	"""Call a direct loader, with the context override where supported"""
+	if hasattr(bpy.context, "temp_override"):  # 3.2+
+		with bpy.context.temp_override(**override):
+			return loader(bpy.context, filepath, *args)
+	return loader(bpy.context, filepath, *args)
+
+
+def load_bvh_direct(context, filepath, load):
+	"""Import a bvh file as import_anim.bvh does with default settings"""
+	global_matrix = axis_conversion(from_forward='-Z', from_up='Y').to_4x4()
+	return load(context, filepath, global_matrix=global_matrix)
+
+
+def load_x3d_direct(context, filepath, load):
+	"""Import an x3d or wrl file as import_scene.x3d does with defaults"""
+	global_matrix = axis_conversion(from_forward='Z', from_up='Y').to_4x4()
+	return load(context, filepath, global_matrix=global_matrix)
+
+
+def load_mdd_direct(context, filepath, load):
+	"""Import an mdd file onto the active object as import_shape.mdd does"""
+	return load(
+		context, filepath, frame_start=context.scene.frame_start, frame_step=1)
+
+
+def load_svg_direct(context, filepath, load_svg):
+	"""Import an svg file as import_curve.svg does"""
+	do_colormanage = context.scene.display_settings.display_device != 'NONE'
+	load_svg(context, filepath, do_colormanage)
+	return {'FINISHED'}
+
+
+# Python importers which can be called without bpy.ops, by operator, as the
+# module and function of the importer add-on and the loader calling it.
+# Only used with default settings, as the operator settings are not applied.
+DIRECT_LOADERS = {
+	"import_anim.bvh": ("io_anim_bvh.import_bvh", "load", load_bvh_direct),
+	"import_scene.x3d": ("io_scene_x3d.import_x3d", "load", load_x3d_direct),
+	"import_shape.mdd": ("io_shape_mdd.import_mdd", "load", load_mdd_direct),
+	"import_curve.svg": (
+		"io_curve_svg.import_svg", "load_svg", load_svg_direct),
+}
+
+
+class FastPathUnsupported(Exception):
+	"""Raised by a fast handler for files it can't read, to use the operator"""
+
+
+# Errors of the fast parsers on content they don't expect, see fast_parse
+FAST_PARSE_ERRORS = (IndexError, KeyError, OSError, TypeError, ValueError)
+
 
+def fast_parse(ext, filepath, settings):
+	"""Parse a file with the fast handler of its extension.
 
-def get_kwargs(context, oper, directory, files):
-	"""Conditionals to detect the best keyword args to use for an operator"""
+	The parsers only check for what they know they don't support, anything
+	else unexpected in the file is reported as unsupported too, so that the
+	operator imports it instead.
+	"""
+	try:
+		return FAST_HANDLERS[ext][0](filepath, **settings)
+	except FAST_PARSE_ERRORS as err:
+		raise FastPathUnsupported("{}: {}".format(type(err).__name__, err))
+
+
+def parse_numbers(data, dtype):
+	"""Parse whitespace separated numbers, any other token is unsupported.
+
+	Older numpy versions only warn and stop at the first such token.
+	"""
+	with warnings.catch_warnings():
+		warnings.simplefilter("error", DeprecationWarning)
+		try:
+			return np.fromstring(data, dtype=dtype, sep=" ")
+		except (DeprecationWarning, ValueError):
+			raise FastPathUnsupported("Unexpected non numeric values")
+
+
+def has_fast_handler(ext, options):
+	"""Whether files of this extension are read by a built-in fast handler"""
+	return bool(options.get("fast")) and ext in FAST_HANDLERS
+
+
+def get_fast_settings(ext, options):
+	"""Keyword arguments for the fast parse function of an extension"""
+	if ext in POINT_CLOUD_EXTENSIONS:
+		return {
+			"voxel_size": options.get("voxel_size", 0.0),
+			"memory_budget": options.get("memory_budget", 2048)}
+	if ext == "mdd":
+		return {
+			"mode": options.get("mdd_mode", "SHAPE_KEYS"),
+			"first_frame": options.get("mdd_first_frame", 0),
+			"last_frame": options.get("mdd_last_frame", 0)}
+	return {}
+
+
+def import_fast(context, filepath, settings=None):
+	"""Import a file with the fast handler for its extension"""
+	ext = os.path.splitext(filepath)[1][1:].lower()
+	FAST_HANDLERS[ext][1](
+		context, fast_parse(ext, filepath, settings or {}))
+	return {'FINISHED'}
+
+
+def get_parse_pool(processes):
+	"""Executor for prefetch_parses, created on demand.
+
+	Uses forked processes on Linux, which hand their arrays back through
+	shared memory. Elsewhere a thread pool: spawned processes would need to
+	import bpy, and forking a multi-threaded blender is unsafe on macOS.
+	"""
+	if parse_pool["executor"] and parse_pool["processes"] == processes:
+		return parse_pool["executor"]
+	shutdown_parse_pool()
+	mp_context = None
+	if sys.platform.startswith("linux"):
+		mp_context = multiprocessing.get_context("fork")
+	if mp_context and shared_memory:
+		executor = ProcessPoolExecutor(processes, mp_context=mp_context)
+	else:
+		executor = ThreadPoolExecutor(processes)
+	parse_pool["executor"] = executor
+	parse_pool["processes"] = processes
+	parse_pool["shared"] = isinstance(executor, ProcessPoolExecutor)
+	return executor
+
+
+def shutdown_parse_pool():
+	"""Stop the parse pool processes, without waiting on running parses"""
+	if parse_pool["executor"]:
+		parse_pool["executor"].shutdown(wait=False)
+	parse_pool["executor"] = None
+	parse_pool["processes"] = 0
+
+
+def prefetch_parses():
+	"""Start parsing the next pending fast files in the parse pool.
+
+	Keeps up to twice as many files as processes parsing ahead, so the
+	main thread only builds the blender data of each file when it's its
+	turn in the queue.
+	"""
+	options = queue_state["options"]
+	processes = options.get("parse_processes", 0)
+	if processes < 1 or not options.get("fast"):
+		return
+	prefetch = queue_state["prefetch"]
+	executor = None
+	try:
+		for filepath, ext in islice(queue_state["pending"], 2 * processes):
+			if filepath in prefetch or ext in LAZY_FAST_HANDLERS:
+				continue
+			if not has_fast_handler(ext, options):
+				continue
+			if not executor:
+				executor = get_parse_pool(processes)
+			prefetch[filepath] = executor.submit(
+				parse_for_queue, ext, filepath,
+				get_fast_settings(ext, options), parse_pool["shared"])
+	except Exception as err:  # e.g. BrokenProcessPool, after a child died
+		stop_prefetching(err)
+
+
+def stop_prefetching(err):
+	"""Parse the rest of the queue on the main thread, after the pool failed.
+
+	A process killed mid parse (e.g. out of memory) breaks the whole pool,
+	so it is dropped along with the parses still pending in it.
+	"""
+	print("Parse pool failed, parsing on the main thread instead: {}".format(
+		err))
+	for future in queue_state["prefetch"].values():
+		discard_prefetched(future)
+	queue_state["prefetch"] = {}
+	queue_state["options"]["parse_processes"] = 0
+	shutdown_parse_pool()
+
+
+def parse_for_queue(ext, filepath, settings, shared):
+	"""Run the fast parse of a file in the parse pool.
+
+	From processes, arrays are returned as shared memory descriptors, which
+	import_prefetched attaches to and unlinks once the data is built.
+	"""
+	payload = fast_parse(ext, filepath, settings)
+	if not shared:
+		return payload
+	created = []
+	try:
+		return share_arrays(payload, created)
+	except Exception:
+		for shm in created:
+			shm.close()
+			shm.unlink()
+		raise
+
+
+def share_arrays(value, created):
+	"""Copy the large arrays of a payload into new shared memory blocks"""
+	if isinstance(value, np.ndarray):
+		if value.nbytes < SHARED_MIN_BYTES:
+			return np.array(value)
+		shm = shared_memory.SharedMemory(create=True, size=value.nbytes)
+		created.append(shm)
+		np.ndarray(value.shape, dtype=value.dtype, buffer=shm.buf)[...] = value
+		try:
+			# The main thread unlinks it, not this process' resource tracker
+			from multiprocessing import resource_tracker
+			resource_tracker.unregister(shm._name, "shared_memory")
+		except (ImportError, AttributeError):
+			pass
+		shm.close()
+		return {
+			"__shared__": shm.name, "dtype": value.dtype, "shape": value.shape}
+	if isinstance(value, dict):
+		return {
+			key: share_arrays(item, created) for key, item in value.items()}
+	if isinstance(value, (list, tuple)):
+		return type(value)(share_arrays(item, created) for item in value)
+	return value
+
+
+def attach_arrays(value, handles):
+	"""Replace shared memory descriptors by arrays viewing the blocks"""
+	if isinstance(value, dict):
+		if "__shared__" in value:
+			shm = shared_memory.SharedMemory(name=value["__shared__"])
+			handles.append(shm)
+			return np.ndarray(
+				value["shape"], dtype=value["dtype"], buffer=shm.buf)
+		return {
+			key: attach_arrays(item, handles) for key, item in value.items()}
+	if isinstance(value, (list, tuple)):
+		return type(value)(attach_arrays(item, handles) for item in value)
+	return value
+
+
+def release_arrays(handles):
+	"""Close and unlink shared memory blocks once their data is built"""
+	for shm in handles:
+		try:
+			shm.close()
+		except BufferError:
+			pass  # Still viewed, closed once the views are collected
+		shm.unlink()
+
+
+def import_prefetched(context, filepath, future):
+	"""Build a file parsed by the parse pool, waiting on it if still running.
+
+	Arrays view the shared memory directly, so foreach_set reads them with
+	no copy on this side.
+	"""
+	ext = os.path.splitext(filepath)[1][1:].lower()
+	handles = []
+	payload = attach_arrays(future.result(), handles)
+	try:
+		FAST_HANDLERS[ext][1](context, payload)
+	finally:
+		payload = None
+		release_arrays(handles)
+	return {'FINISHED'}
+
+
+def discard_prefetched(future):
+	"""Cancel a prefetched parse, freeing its shared memory if it ran"""
+	if future.cancel():
+		return
+
+	def release(done):
+		if done.cancelled() or done.exception():
+			return
+		handles = []
+		attach_arrays(done.result(), handles)
+		release_arrays(handles)
+	future.add_done_callback(release)
+
+
+def build_mesh(part):
+	"""Create a mesh from the arrays of a parsed part, using foreach_set.
+
+	Part keys: name, positions (N, 3) and either triangles (T, 3), or
+	loop_vertices (L,) with face_sizes (F,). Without faces, only points.
+	Optional: loop_uvs (L, 2), loop_normals (L, 3), vertex_normals (N, 3),
+	vertex_colors (N, 3|4), attributes as a dict of name: (N,) or (N, 3),
+	mesh_name, and the name of a material or a list of materials with
+	material_indices (F,).
+	"""
+	mesh = bpy.data.meshes.new(part.get("mesh_name") or part["name"])
+	positions = np.ascontiguousarray(part["positions"], dtype=np.float32)
+	mesh.vertices.add(len(positions))
+	mesh.vertices.foreach_set("co", positions.ravel())
+
+	if "triangles" in part:
+		loop_vertices = part["triangles"].ravel()
+		face_sizes = np.full(len(part["triangles"]), 3, dtype=np.int32)
+	else:
+		loop_vertices = part.get("loop_vertices")
+		face_sizes = part.get("face_sizes")
+	if face_sizes is not None and len(face_sizes):
+		loop_starts = np.zeros(len(face_sizes), dtype=np.int32)
+		np.cumsum(face_sizes[:-1], out=loop_starts[1:])
+		mesh.loops.add(len(loop_vertices))
+		mesh.loops.foreach_set(
+			"vertex_index", np.ascontiguousarray(loop_vertices, np.int32))
+		mesh.polygons.add(len(face_sizes))
+		mesh.polygons.foreach_set("loop_start", loop_starts)
+		try:
+			mesh.polygons.foreach_set(
+				"loop_total", np.ascontiguousarray(face_sizes, np.int32))
+		except (AttributeError, RuntimeError, TypeError):
+			pass  # Read only in newer versions, derived from loop_start
+		if part.get("material_indices") is not None:
+			mesh.polygons.foreach_set(
+				"material_index",
+				np.ascontiguousarray(part["material_indices"], np.int32))
+
+	if part.get("loop_uvs") is not None:
+		uv_layer = mesh.uv_layers.new(name="UVMap")
+		uv_layer.data.foreach_set(
+			"uv", np.ascontiguousarray(part["loop_uvs"], np.float32).ravel())
+	if part.get("vertex_colors") is not None:
+		set_vertex_colors(mesh, part["vertex_colors"])
+	for name, values in part.get("attributes", {}).items():
+		set_point_attribute(mesh, name, values)
+	if part.get("vertex_normals") is not None:
+		set_point_attribute(mesh, "vertex_normal", part["vertex_normals"])
+	materials = part.get("materials") or (
+		[part["material"]] if part.get("material") else [])
+	for name in materials:
+		material = bpy.data.materials.get(name)
+		if not material:
+			material = bpy.data.materials.new(name)
+		mesh.materials.append(material)
+
+	loop_count = len(mesh.loops)
+	mesh.validate(clean_customdata=False)
+	mesh.update(calc_edges=True)
+
+	# Custom normals are per loop, skip them if validate removed any loops
+	if part.get("loop_normals") is not None and len(mesh.loops) == loop_count:
+		set_custom_normals(mesh, part["loop_normals"])
+	elif part.get("vertex_normals") is not None and len(mesh.polygons):
+		set_custom_normals(mesh, part["vertex_normals"], per_vertex=True)
+	return mesh
+
+
+def set_point_attribute(mesh, name, values):
+	"""Add an (N,) float or (N, 3) vector array as a point attribute"""
+	if not hasattr(mesh, "attributes"):  # pre 2.91
+		return
+	if values.ndim == 1:
+		attr = mesh.attributes.new(name=name, type='FLOAT', domain='POINT')
+		key = "value"
+	else:
+		attr = mesh.attributes.new(
+			name=name, type='FLOAT_VECTOR', domain='POINT')
+		key = "vector"
+	attr.data.foreach_set(
+		key, np.ascontiguousarray(values, np.float32).ravel())
+
+
+def set_vertex_colors(mesh, colors):
+	"""Add an (N, 3) or (N, 4) float array as a point color attribute"""
+	if not hasattr(mesh, "attributes"):  # pre 2.91
+		return
+	if colors.shape[1] == 3:
+		colors = np.concatenate(
+			[colors, np.ones((len(colors), 1), dtype=colors.dtype)], axis=1)
+	attr = mesh.attributes.new(name="Col", type='FLOAT_COLOR', domain='POINT')
+	attr.data.foreach_set(
+		"color", np.ascontiguousarray(colors, np.float32).ravel())
+
+
+def set_custom_normals(mesh, normals, per_vertex=False):
+	"""Apply (L, 3) per loop, or (N, 3) per vertex, custom split normals"""
+	if hasattr(mesh, "use_auto_smooth"):  # pre 4.1
+		mesh.use_auto_smooth = True
+	mesh.polygons.foreach_set(
+		"use_smooth", np.ones(len(mesh.polygons), dtype=bool))
+	normals = np.ascontiguousarray(normals, np.float32)
+	if per_vertex:
+		mesh.normals_split_custom_set_from_vertices(normals)
+	else:
+		mesh.normals_split_custom_set(normals)
+
+
+def build_mesh_objects(context, parts):
+	"""Create and link an object for each parsed part.
+
+	Parts with the same mesh_key share one mesh, only the first of them
+	needs the arrays. An optional 4x4 matrix sets the object transform.
+	"""
+	collection = get_import_collection(context)
+	meshes = {}
+	objects = []
+	for part in parts:
+		key = part.get("mesh_key")
+		mesh = meshes.get(key) if key is not None else None
+		if mesh is None:
+			mesh = build_mesh(part)
+			if key is not None:
+				meshes[key] = mesh
+		obj = bpy.data.objects.new(part["name"], mesh)
+		if part.get("matrix") is not None:
+			obj.matrix_world = Matrix(np.asarray(part["matrix"]).tolist())
+		collection.objects.link(obj)
+		obj.select_set(True)
+		objects.append(obj)
+	return objects
+
+
+# Binary stl triangle record, 50 bytes
+STL_DTYPE = np.dtype([
+	("normal", "<f4", (3,)),
+	("vertices", "<f4", (3, 3)),
+	("attribute", "<u2"),
+])
+
+# Size of blocks read at once when parsing text files
+CHUNK_SIZE = 64 * 1024 * 1024
+
+# Smaller blocks for obj, as each block's records are gathered as lines
+OBJ_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def weld_vertices(corners):
+	"""Merge identical (N, 3) corner positions into unique vertices.
+
+	Returns the unique positions, and the index of each corner into them.
+	"""
+	corners = corners + np.float32(0.0)  # copy as float32, and -0.0 to 0.0
+	keys = corners.view(np.dtype((np.void, corners.dtype.itemsize * 3)))
+	_, first, inverse = np.unique(
+		keys.ravel(), return_index=True, return_inverse=True)
+	return corners[first], inverse.ravel().astype(np.int32)
+
+
+def parse_stl(filepath):
+	"""Parse a binary or ascii stl file into one welded triangle mesh part.
+
+	Binary files are memory mapped, with the triangle records viewed through
+	STL_DTYPE rather than read into python objects.
+	"""
+	size = os.path.getsize(filepath)
+	with open(filepath, "rb") as fd:
+		header = fd.read(84)
+	count = -1
+	if len(header) == 84:
+		count = int(np.frombuffer(header, dtype="<u4", count=1, offset=80)[0])
+	if 84 + count * 50 == size:
+		if count:
+			records = np.memmap(
+				filepath, dtype=STL_DTYPE, mode="r", offset=84, shape=(count,))
+			corners = records["vertices"].reshape(-1, 3)
+		else:
+			corners = np.zeros((0, 3), dtype=np.float32)
+	elif header.lstrip().startswith(b"solid"):
+		corners = parse_stl_ascii(filepath)
+	else:
+		raise FastPathUnsupported("Not a valid stl file")
+
+	positions, loop_vertices = weld_vertices(corners)
+	return [{
+		"name": os.path.splitext(os.path.basename(filepath))[0],
+		"positions": positions,
+		"triangles": loop_vertices.reshape(-1, 3),
+	}]
+
+
+def parse_stl_ascii(filepath):
+	"""Parse the corners of an ascii stl file, CHUNK_SIZE bytes at a time.
+
+	Dropping the keywords leaves only numbers, twelve per facet (normal and
+	three vertices), which numpy parses in one go per chunk.
+	"""
+	chunks = []
+	tail = b""
+	with open(filepath, "rb") as fd:
+		while True:
+			block = fd.read(CHUNK_SIZE)
+			data = tail + block
+			if block:
+				cut = data.rfind(b"endfacet")
+				if cut == -1:
+					tail = data
+					continue
+				cut += len(b"endfacet")
+				data, tail = data[:cut], data[cut:]
+			data = re.sub(rb"(end)?solid[^\n]*", b" ", data)
+			for keyword in (
+					b"facet normal", b"outer loop", b"endloop", b"endfacet",
+					b"vertex"):
+				data = data.replace(keyword, b" ")
+			if data.strip():
+				values = parse_numbers(data, np.float32)
+				if values.size % 12:
+					raise FastPathUnsupported("Unexpected ascii stl content")
+				chunks.append(values.reshape(-1, 12)[:, 3:].reshape(-1, 3))
+			if not block:
+				break
+	if not chunks:
+		return np.zeros((0, 3), dtype=np.float32)
+	return np.concatenate(chunks)
+
+
+class GrowableArray:
+	"""Numpy array extended in blocks, growing its capacity geometrically.
+
+	Keeps appends amortized O(1) without python lists per element, and the
+	unused capacity at the end below the size of the data.
+	"""
+
+	def __init__(self, dtype, width=None):
+		shape = (1024, width) if width else (1024,)
+		self.data = np.empty(shape, dtype=dtype)
+		self.size = 0
+
+	def extend(self, values):
+		count = len(values)
+		if self.size + count > len(self.data):
+			capacity = max(self.size + count, 2 * len(self.data))
+			data = np.empty(
+				(capacity,) + self.data.shape[1:], dtype=self.data.dtype)
+			data[:self.size] = self.data[:self.size]
+			self.data = data
+		self.data[self.size:self.size + count] = values
+		self.size += count
+
+	def view(self):
+		"""The filled part of the array, without copying"""
+		return self.data[:self.size]
+
+
+def count_tokens(data):
+	"""Number of whitespace separated tokens on each line of a block"""
+	chars = np.frombuffer(data, dtype=np.uint8)
+	blank = (chars == 32) | (chars == 9) | (chars == 13) | (chars == 10)
+	prev_blank = np.empty_like(blank)
+	prev_blank[0] = True
+	prev_blank[1:] = blank[:-1]
+	starts = np.flatnonzero(~blank & prev_blank)
+	newlines = np.flatnonzero(chars == 10)
+	lines = np.searchsorted(newlines, starts)
+	return np.bincount(lines, minlength=len(newlines) + 1).astype(np.int32)
+
+
+def parse_float_rows(lines, min_width):
+	"""Parse lines of floats into a 2D array, all with the width of the first"""
+	width = len(lines[0].split())
+	if width < min_width:
+		raise FastPathUnsupported("Too few values in: " + lines[0].decode())
+	values = parse_numbers(b"\n".join(lines), np.float32)
+	if values.size != width * len(lines):
+		raise FastPathUnsupported("Inconsistent number of values per line")
+	return values.reshape(-1, width)
+
+
+def parse_obj(filepath):
+	"""Stream an obj file into one mesh part, reading it in large blocks.
+
+	The v, vt, vn and f records of each block are parsed with numpy into
+	arrays growing geometrically, so no python objects are made per vertex
+	or face. Objects and groups are merged, files with more than one
+	material are left to the operator.
+	"""
+	positions = GrowableArray(np.float32, 3)
+	colors = GrowableArray(np.float32, 3)
+	uvs = GrowableArray(np.float32, 2)
+	normals = GrowableArray(np.float32, 3)
+	face_sizes = GrowableArray(np.int32)
+	corners = {
+		"v": GrowableArray(np.int32),
+		"vt": GrowableArray(np.int32),
+		"vn": GrowableArray(np.int32),
+	}
+	materials = set()
+	tail = b""
+	with open(filepath, "rb") as fd:
+		while True:
+			block = fd.read(OBJ_CHUNK_SIZE)
+			data = tail + block
+			if block:
+				cut = data.rfind(b"\n") + 1
+				data, tail = data[:cut], data[cut:]
+
+			materials.update(
+				re.findall(rb"^usemtl[ \t]+([^\r\n]*)", data, re.M))
+			if len(materials) > 1:
+				raise FastPathUnsupported("Multiple materials")
+			counts = {"v": positions.size, "vt": uvs.size, "vn": normals.size}
+
+			lines = re.findall(rb"^v[ \t]+([^\r\n]*)", data, re.M)
+			if lines:
+				rows = parse_float_rows(lines, 3)
+				positions.extend(rows[:, :3])
+				if rows.shape[1] in (6, 7):  # x y z r g b, with optional w
+					colors.extend(rows[:, -3:])
+			lines = re.findall(rb"^vt[ \t]+([^\r\n]*)", data, re.M)
+			if lines:
+				uvs.extend(parse_float_rows(lines, 2)[:, :2])
+			lines = re.findall(rb"^vn[ \t]+([^\r\n]*)", data, re.M)
+			if lines:
+				normals.extend(parse_float_rows(lines, 3)[:, :3])
+			lines = re.findall(rb"^f[ \t]+([^\r\n]*)", data, re.M)
+			if lines:
+				parse_obj_faces(data, lines, counts, face_sizes, corners)
+			if not block:
+				break
+
+	if colors.size and colors.size != positions.size:
+		raise FastPathUnsupported("Vertex colors on only some vertices")
+	for key, array in (("v", positions), ("vt", uvs), ("vn", normals)):
+		indices = corners[key].view()
+		if len(indices) and (indices.min() < 0 or indices.max() >= array.size):
+			raise FastPathUnsupported("Face index out of range")
+
+	part = {
+		"name": os.path.splitext(os.path.basename(filepath))[0],
+		"positions": y_up_to_z_up(positions.view()),
+		"loop_vertices": corners["v"].view(),
+		"face_sizes": face_sizes.view(),
+	}
+	if colors.size:
+		part["vertex_colors"] = colors.view()
+	if materials:
+		part["material"] = materials.pop().decode(errors="replace")
+	loop_count = corners["v"].size
+	if uvs.size and corners["vt"].size == loop_count:
+		part["loop_uvs"] = uvs.view()[corners["vt"].view()]
+	if normals.size and corners["vn"].size == loop_count:
+		loop_normals = normals.view()[corners["vn"].view()]
+		part["loop_normals"] = y_up_to_z_up(loop_normals)
+	return [part]
+
+
+def parse_obj_faces(data, lines, counts, face_sizes, corners):
+	"""Parse the face records of a block, appending 0 based corner indices.
+
+	counts holds the number of v, vt and vn records before this block, to
+	resolve relative (negative) indices.
+	"""
+	first = lines[0].split()[0]
+	if b"//" in first:
+		keys = ("v", "vn")
+	else:
+		keys = ("v", "vt", "vn")[:first.count(b"/") + 1]
+	joined = b"\n".join(lines)
+	sizes = count_tokens(joined)
+	values = parse_numbers(
+		joined.replace(b"//", b" ").replace(b"/", b" "), np.int64)
+	if values.size != sizes.sum() * len(keys):
+		raise FastPathUnsupported("Inconsistent face format")
+	values = values.reshape(-1, len(keys))
+
+	if (values < 0).any():
+		# Relative indices count back from the records before each face line
+		kinds = re.findall(rb"^(v|vt|vn|f)[ \t]", data, re.M)
+		kinds = np.array(kinds, dtype="S2")
+		is_face = kinds == b"f"
+	for i, key in enumerate(keys):
+		indices = values[:, i]
+		negative = indices < 0
+		if negative.any():
+			before = np.cumsum(kinds == key.encode())[is_face]
+			bases = np.repeat(counts[key] + before, sizes)
+			indices = np.where(negative, bases + indices, indices - 1)
+		else:
+			indices = indices - 1
+		corners[key].extend(indices)
+	face_sizes.extend(sizes)
+
+
+def y_up_to_z_up(vectors):
+	"""Convert (N, 3) vectors from a Y up to blender's Z up convention"""
+	converted = np.empty_like(vectors)
+	converted[:, 0] = vectors[:, 0]
+	converted[:, 1] = -vectors[:, 2]
+	converted[:, 2] = vectors[:, 1]
+	return converted
+
+
+# Numpy types of ply properties, by their names in the header
+PLY_TYPES = {
+	"char": "i1", "int8": "i1",
+	"uchar": "u1", "uint8": "u1",
+	"short": "i2", "int16": "i2",
+	"ushort": "u2", "uint16": "u2",
+	"int": "i4", "int32": "i4",
+	"uint": "u4", "uint32": "u4",
+	"float": "f4", "float32": "f4",
+	"double": "f8", "float64": "f8",
+}
+
+
+def parse_ply_header(fd):
+	"""Read a ply header, returns format, elements and the header size.
+
+	Elements are (name, count, properties), properties being (name, type)
+	or, for lists, (name, (count type, item type)).
+	"""
+	if fd.readline().strip() != b"ply":
+		raise FastPathUnsupported("Not a ply file")
+	fmt = None
+	elements = []
+	while True:
+		line = fd.readline()
+		if not line:
+			raise FastPathUnsupported("Missing end_header")
+		words = line.decode("ascii", errors="replace").split()
+		if not words or words[0] in ("comment", "obj_info"):
+			continue
+		if words[0] == "end_header":
+			break
+		try:
+			if words[0] == "format":
+				fmt = words[1]
+			elif words[0] == "element":
+				elements.append((words[1], int(words[2]), []))
+			elif words[0] == "property" and words[1] == "list":
+				elements[-1][2].append(
+					(words[4], (PLY_TYPES[words[2]], PLY_TYPES[words[3]])))
+			elif words[0] == "property":
+				elements[-1][2].append((words[2], PLY_TYPES[words[1]]))
+		except (IndexError, KeyError, ValueError):
+			raise FastPathUnsupported("Unsupported header line: " + line.decode(
+				"ascii", errors="replace").strip())
+	if fmt not in ("ascii", "binary_little_endian", "binary_big_endian"):
+		raise FastPathUnsupported("Unsupported ply format: " + str(fmt))
+	return fmt, elements, fd.tell()
+
+
+def ply_element_dtype(props, byteorder, list_sizes):
+	"""Structured dtype of an element, with fixed sizes for list properties"""
+	fields = []
+	for name, ptype in props:
+		if isinstance(ptype, tuple):
+			fields.append((name + "_count", byteorder + ptype[0]))
+			fields.append((name, byteorder + ptype[1], (list_sizes[name],)))
+		else:
+			fields.append((name, byteorder + ptype))
+	return np.dtype(fields)
+
+
+def ply_list_sizes(filepath, offset, props, byteorder):
+	"""Sizes of the list properties in the first record of an element"""
+	sizes = {}
+	with open(filepath, "rb") as fd:
+		fd.seek(offset)
+		for name, ptype in props:
+			if isinstance(ptype, tuple):
+				count_type = np.dtype(byteorder + ptype[0])
+				count = int(np.frombuffer(
+					fd.read(count_type.itemsize), dtype=count_type)[0])
+				sizes[name] = count
+				fd.seek(count * np.dtype(ptype[1]).itemsize, 1)
+			else:
+				fd.seek(np.dtype(ptype).itemsize, 1)
+	return sizes
+
+
+def read_ply_elements(filepath, fmt, elements, header_size):
+	"""Map each ply element onto a structured array, by element name.
+
+	Binary elements are memory mapped in place. List properties need the
+	same length in every record (e.g. only triangles), or the file is left
+	to the operator.
+	"""
+	arrays = {}
+	if fmt == "ascii":
+		with open(filepath, "rb") as fd:
+			fd.seek(header_size)
+			data = fd.read()
+		newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 10)
+		line = 0
+		start = 0
+		for name, count, props in elements:
+			if not count:
+				continue
+			if line + count > len(newlines) + 1:
+				raise FastPathUnsupported("Truncated ply element: " + name)
+			end = newlines[line + count - 1] if line + count <= len(newlines) \
+				else len(data)
+			sizes = {}
+			first = data[start:newlines[line] if line < len(newlines) else None]
+			values = first.split()
+			pos = 0
+			for pname, ptype in props:
+				if isinstance(ptype, tuple):
+					sizes[pname] = int(values[pos])
+					pos += sizes[pname] + 1
+				else:
+					pos += 1
+			dtype = ply_element_dtype(props, "=", sizes)
+			text = parse_numbers(data[start:end], np.float64)
+			width = sum(
+				1 + sizes[pname] if isinstance(ptype, tuple) else 1
+				for pname, ptype in props)
+			if text.size != width * count:
+				raise FastPathUnsupported("Varying list sizes in: " + name)
+			rows = text.reshape(count, width)
+			array = np.empty(count, dtype=dtype)
+			col = 0
+			for field in dtype.names:
+				shape = dtype[field].shape
+				span = shape[0] if shape else 1
+				values = rows[:, col:col + span]
+				array[field] = values if shape else values[:, 0]
+				col += span
+			arrays[name] = array
+			line += count
+			start = end + 1
+		return arrays
+
+	byteorder = "<" if fmt == "binary_little_endian" else ">"
+	offset = header_size
+	file_size = os.path.getsize(filepath)
+	for name, count, props in elements:
+		if not count:
+			arrays[name] = None
+			continue
+		sizes = ply_list_sizes(filepath, offset, props, byteorder)
+		dtype = ply_element_dtype(props, byteorder, sizes)
+		if offset + count * dtype.itemsize > file_size:
+			# Truncated, or a first list longer than the next ones
+			raise FastPathUnsupported(
+				"Varying list sizes or truncated element: " + name)
+		array = np.memmap(
+			filepath, dtype=dtype, mode="r", offset=offset, shape=(count,))
+		for pname in sizes:
+			if (array[pname + "_count"] != sizes[pname]).any():
+				raise FastPathUnsupported("Varying list sizes in: " + name)
+		arrays[name] = array
+		offset += count * dtype.itemsize
+	return arrays
+
+
+def parse_ply(filepath):
+	"""Parse a ply mesh or point cloud into one mesh part.
+
+	Positions, faces, normals, colors and any other vertex properties (as
+	attributes) come straight from the element arrays of read_ply_elements.
+	"""
+	with open(filepath, "rb") as fd:
+		fmt, elements, header_size = parse_ply_header(fd)
+	arrays = read_ply_elements(filepath, fmt, elements, header_size)
+	vertices = arrays.get("vertex")
+	if vertices is None or not {"x", "y", "z"} <= set(vertices.dtype.names):
+		raise FastPathUnsupported("No vertex positions")
+
+	def column(name):
+		return np.asarray(vertices[name], dtype=np.float32)
+
+	part = {
+		"name": os.path.splitext(os.path.basename(filepath))[0],
+		"positions": np.stack([column(axis) for axis in "xyz"], axis=1),
+		"attributes": {},
+	}
+	names = list(vertices.dtype.names)
+	used = {"x", "y", "z"}
+	if {"nx", "ny", "nz"} <= set(names):
+		part["vertex_normals"] = np.stack(
+			[column(axis) for axis in ("nx", "ny", "nz")], axis=1)
+		used.update(("nx", "ny", "nz"))
+	channels = [
+		name for name in ("red", "green", "blue", "alpha") if name in names]
+	if {"red", "green", "blue"} <= set(channels):
+		colors = np.stack([column(name) for name in channels], axis=1)
+		if vertices.dtype["red"].kind in "iu":
+			colors /= np.float32(np.iinfo(vertices.dtype["red"]).max)
+		part["vertex_colors"] = colors
+		used.update(channels)
+	for name in names:
+		if name not in used and not vertices.dtype[name].shape:
+			part["attributes"][name] = column(name)
+
+	faces = arrays.get("face")
+	if faces is not None:
+		key = "vertex_indices" if "vertex_indices" in faces.dtype.names \
+			else "vertex_index"
+		if key not in faces.dtype.names:
+			raise FastPathUnsupported("No face vertex indices")
+		indices = np.asarray(faces[key], dtype=np.int32)
+		part["loop_vertices"] = indices.ravel()
+		part["face_sizes"] = np.full(
+			len(indices), indices.shape[1], dtype=np.int32)
+	return [part]
+
+
+# Numpy types of gltf accessor components, all little endian
+GLTF_COMPONENT_TYPES = {
+	5120: "i1", 5121: "u1", 5122: "<i2", 5123: "<u2", 5125: "<u4", 5126: "<f4"}
+
+# Components per accessor element
+GLTF_TYPE_SIZES = {
+	"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4,
+	"MAT2": 4, "MAT3": 9, "MAT4": 16}
+
+# Extensions which add content the fast path would otherwise drop
+GLTF_UNSUPPORTED_EXTENSIONS = {
+	"KHR_draco_mesh_compression",
+	"EXT_meshopt_compression",
+	"KHR_lights_punctual",
+	"KHR_materials_variants",
+	"EXT_mesh_gpu_instancing",
+}
+
+# Vertex attributes built by gltf_mesh_part, or which the importer ignores too
+GLTF_ATTRIBUTES = {"POSITION", "NORMAL", "TEXCOORD_0", "COLOR_0", "TANGENT"}
+
+# Default values of material properties, the only ones read by name only
+GLTF_MATERIAL_DEFAULTS = {
+	"alphaMode": "OPAQUE",
+	"doubleSided": False,
+	"emissiveFactor": [0.0, 0.0, 0.0],
+	"baseColorFactor": [1.0, 1.0, 1.0, 1.0],
+	"metallicFactor": 1.0,
+	"roughnessFactor": 1.0,
+}
+
+# Y up to Z up, as a 4x4 transform
+GLTF_TO_BLENDER = np.array([
+	[1.0, 0.0, 0.0, 0.0],
+	[0.0, 0.0, -1.0, 0.0],
+	[0.0, 1.0, 0.0, 0.0],
+	[0.0, 0.0, 0.0, 1.0]])
 
-	# get the common kwargs for import operators
+
+def read_gltf_json(filepath):
+	"""Read the json of a gltf or glb file.
+
+	Returns the json and the (offset, size) of the glb binary chunk, None
+	for gltf files or glb files without one.
+	"""
+	if not filepath.lower().endswith(".glb"):
+		with open(filepath, "rb") as fd:
+			return json.loads(fd.read().decode("utf-8")), None
+	with open(filepath, "rb") as fd:
+		header = fd.read(20)
+		if len(header) < 20 or header[:4] != b"glTF":
+			raise FastPathUnsupported("Not a glb file")
+		version, _, json_size, json_type = np.frombuffer(
+			header[4:], dtype="<u4")
+		if version != 2 or json_type != 0x4E4F534A:
+			raise FastPathUnsupported("Unsupported glb version")
+		gltf = json.loads(fd.read(int(json_size)).decode("utf-8"))
+		chunk = fd.read(8)
+	if len(chunk) == 8:
+		bin_size, bin_type = np.frombuffer(chunk, dtype="<u4")
+		if bin_type == 0x004E4942 and bin_size:
+			return gltf, (28 + int(json_size), int(bin_size))
+	return gltf, None
+
+
+def read_gltf(filepath):
+	"""Read the json of a gltf or glb file and memory map its buffers"""
+	gltf, chunk = read_gltf_json(filepath)
+	glb_chunk = None
+	if chunk:
+		glb_chunk = np.memmap(
+			filepath, dtype=np.uint8, mode="r", offset=chunk[0],
+			shape=(chunk[1],))
+
+	buffers = []
+	for buffer in gltf.get("buffers", []):
+		uri = buffer.get("uri")
+		if uri is None:
+			if glb_chunk is None:
+				raise FastPathUnsupported("Missing glb binary chunk")
+			buffers.append(glb_chunk)
+		elif uri.startswith("data:"):
+			raise FastPathUnsupported("Embedded data uri buffers")
+		elif not buffer.get("byteLength"):
+			buffers.append(np.zeros(0, dtype=np.uint8))
+		else:
+			path = os.path.join(os.path.dirname(filepath), unquote(uri))
+			buffers.append(np.memmap(path, dtype=np.uint8, mode="r"))
+	return gltf, buffers
+
+
+def gltf_accessor(gltf, buffers, index):
+	"""View an accessor as a (count, components) array over its buffer.
+
+	Uses the buffer view stride, so interleaved vertex data is not copied.
+	Normalized integers are converted to floats.
+	"""
+	accessor = gltf["accessors"][index]
+	if "sparse" in accessor or "bufferView" not in accessor:
+		raise FastPathUnsupported("Sparse accessors")
+	view = gltf["bufferViews"][accessor["bufferView"]]
+	dtype = np.dtype(GLTF_COMPONENT_TYPES[accessor["componentType"]])
+	width = GLTF_TYPE_SIZES[accessor["type"]]
+	stride = view.get("byteStride") or dtype.itemsize * width
+	array = np.ndarray(
+		(accessor["count"], width),
+		dtype=dtype,
+		buffer=memoryview(buffers[view["buffer"]]),
+		offset=view.get("byteOffset", 0) + accessor.get("byteOffset", 0),
+		strides=(stride, dtype.itemsize))
+	if accessor.get("normalized") and dtype.kind in "iu":
+		array = np.maximum(
+			array / np.float32(np.iinfo(dtype).max), np.float32(-1.0))
+	return array
+
+
+def gltf_node_matrix(node):
+	"""Local 4x4 transform of a node, from its matrix or TRS values"""
+	if "matrix" in node:
+		return np.array(node["matrix"], dtype=np.float64).reshape(4, 4).T
+	x, y, z, w = node.get("rotation", (0.0, 0.0, 0.0, 1.0))
+	matrix = np.identity(4)
+	matrix[:3, :3] = [
+		[1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+		[2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+		[2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)]]
+	matrix[:3, :3] *= np.asarray(node.get("scale", (1.0, 1.0, 1.0)))
+	matrix[:3, 3] = node.get("translation", (0.0, 0.0, 0.0))
+	return matrix
+
+
+def gltf_mesh_part(gltf, buffers, index):
+	"""Merge the triangle primitives of a gltf mesh into one mesh part"""
+	mesh = gltf["meshes"][index]
+	materials = []
+	positions, triangles, uvs, normals, colors, slots = [], [], [], [], [], []
+	offset = 0
+	for primitive in mesh["primitives"]:
+		if primitive.get("targets"):
+			raise FastPathUnsupported("Morph targets")
+		if primitive.get("mode", 4) != 4:
+			raise FastPathUnsupported("Non triangle primitives")
+		attributes = primitive["attributes"]
+		if set(attributes) - GLTF_ATTRIBUTES:
+			raise FastPathUnsupported("Unsupported attributes: " + ", ".join(
+				sorted(set(attributes) - GLTF_ATTRIBUTES)))
+		prim_positions = gltf_accessor(gltf, buffers, attributes["POSITION"])
+		if "indices" in primitive:
+			indices = gltf_accessor(gltf, buffers, primitive["indices"])
+		else:
+			indices = np.arange(len(prim_positions), dtype=np.int32)
+		if indices.size % 3:
+			raise FastPathUnsupported("Incomplete triangles")
+		indices = indices.reshape(-1, 3).astype(np.int32)
+		positions.append(prim_positions.astype(np.float32))
+		triangles.append(indices + offset)
+		offset += len(prim_positions)
+
+		if "NORMAL" in attributes:
+			normals.append(gltf_accessor(gltf, buffers, attributes["NORMAL"]))
+		else:
+			normals.append(None)
+		if "TEXCOORD_0" in attributes:
+			uv = gltf_accessor(gltf, buffers, attributes["TEXCOORD_0"])
+			uvs.append(uv.astype(np.float32)[indices.ravel()])
+		else:
+			uvs.append(None)
+		if "COLOR_0" in attributes:
+			colors.append(gltf_accessor(gltf, buffers, attributes["COLOR_0"]))
+		else:
+			colors.append(None)
+
+		material = None
+		if "material" in primitive:
+			material = gltf["materials"][primitive["material"]].get(
+				"name", "Material")
+			if material not in materials:
+				materials.append(material)
+		slots.append((material, len(indices)))
+
+	part = {
+		"mesh_name": mesh.get("name") or "Mesh",
+		"positions": y_up_to_z_up(np.concatenate(positions)),
+		"triangles": np.concatenate(triangles),
+	}
+	# Normals need every primitive, uvs and colors are filled in if missing
+	if all(normal is not None for normal in normals):
+		vertex_normals = y_up_to_z_up(
+			np.concatenate(normals).astype(np.float32))
+		part["loop_normals"] = vertex_normals[part["triangles"].ravel()]
+	if any(uv is not None for uv in uvs):
+		part["loop_uvs"] = np.concatenate([
+			uv if uv is not None else np.zeros((len(tris) * 3, 2), np.float32)
+			for uv, tris in zip(uvs, triangles)])
+		part["loop_uvs"][:, 1] = 1.0 - part["loop_uvs"][:, 1]
+	if any(color is not None for color in colors):
+		width = max(color.shape[1] for color in colors if color is not None)
+		filled = []
+		for color, prim_positions in zip(colors, positions):
+			if color is None:
+				color = np.ones((len(prim_positions), width), np.float32)
+			elif color.shape[1] < width:
+				color = np.concatenate([
+					color, np.ones((len(color), 1), np.float32)], axis=1)
+			filled.append(color.astype(np.float32))
+		part["vertex_colors"] = np.concatenate(filled)
+	if materials:
+		part["materials"] = materials
+		part["material_indices"] = np.concatenate([
+			np.full(count, materials.index(name) if name else 0, np.int32)
+			for name, count in slots])
+	return part
+
+
+def is_plain_gltf_material(material):
+	"""Whether a gltf material has only default values, so only its name"""
+	values = dict(material.get("pbrMetallicRoughness", {}))
+	values.update(
+		(key, value) for key, value in material.items()
+		if key not in ("name", "extras", "pbrMetallicRoughness"))
+	return all(
+		key in GLTF_MATERIAL_DEFAULTS and value == GLTF_MATERIAL_DEFAULTS[key]
+		for key, value in values.items())
+
+
+def parse_gltf(filepath):
+	"""Parse the meshes of a gltf or glb scene into mesh parts.
+
+	Each node with a mesh becomes a part with its world matrix, and nodes
+	sharing a mesh share its data. Falls back for anything else the
+	importer would build: skins, animations, morph targets, cameras, node
+	hierarchies and empties, textures, material values, extra attributes
+	and required extensions.
+	"""
+	gltf, buffers = read_gltf(filepath)
+	if gltf.get("extensionsRequired"):
+		raise FastPathUnsupported("Required extensions")
+	if set(gltf.get("extensionsUsed", [])) & GLTF_UNSUPPORTED_EXTENSIONS:
+		raise FastPathUnsupported("Unsupported extensions")
+	for key in ("skins", "animations", "cameras", "images", "textures"):
+		if gltf.get(key):
+			raise FastPathUnsupported("File has " + key)
+	if not all(map(is_plain_gltf_material, gltf.get("materials", []))):
+		raise FastPathUnsupported("Materials with textures or values")
+	nodes = gltf.get("nodes", [])
+	if any("mesh" not in node or node.get("children") for node in nodes):
+		raise FastPathUnsupported("Node hierarchy or non mesh nodes")
+	scenes = gltf.get("scenes")
+	if scenes:
+		roots = scenes[gltf.get("scene", 0)].get("nodes", [])
+	else:
+		children = {
+			child for node in nodes for child in node.get("children", [])}
+		roots = [index for index in range(len(nodes)) if index not in children]
+
+	parts = []
+	mesh_parts = {}
+	stack = [(index, np.identity(4)) for index in reversed(roots)]
+	while stack:
+		index, parent_matrix = stack.pop()
+		node = nodes[index]
+		matrix = parent_matrix @ gltf_node_matrix(node)
+		if "mesh" in node:
+			mesh_index = node["mesh"]
+			if mesh_index in mesh_parts:
+				part = {}
+			else:
+				part = gltf_mesh_part(gltf, buffers, mesh_index)
+				mesh_parts[mesh_index] = part
+			part["name"] = node.get("name") or \
+				mesh_parts[mesh_index]["mesh_name"]
+			part["mesh_key"] = mesh_index
+			part["matrix"] = GLTF_TO_BLENDER @ matrix @ GLTF_TO_BLENDER.T
+			parts.append(part)
+		for child in reversed(node.get("children", [])):
+			stack.append((child, matrix))
+	if not parts:
+		raise FastPathUnsupported("No meshes")
+	return parts
+
+
+# Extensions read by parse_points, which take its settings
+POINT_CLOUD_EXTENSIONS = ("csv", "xyz")
+
+# Delimiters of point files, read as whitespace
+POINT_DELIMITERS = bytes.maketrans(b",;\t", b"   ")
+
+# Header names of color columns, in rgb order
+POINT_COLOR_NAMES = (("r", "g", "b"), ("red", "green", "blue"))
+
+
+def is_number(token):
+	"""Whether a text token parses as a float"""
+	try:
+		float(token)
+	except ValueError:
+		return False
+	return True
+
+
+def detect_point_columns(head):
+	"""Find the column names and header size of a point file.
+
+	Returns (names, header size in bytes). Without a header line the first
+	three columns are x, y and z. Molecule style xyz files, with an atom
+	count line or element symbols, are left to the operator.
+	"""
+	offset = 0
+	header = None
+	for line in head.split(b"\n")[:-1]:
+		tokens = line.translate(POINT_DELIMITERS).split()
+		if not tokens:
+			offset += len(line) + 1
+			continue
+		if header is None and not any(is_number(tok) for tok in tokens):
+			header = [
+				tok.decode("utf-8", errors="replace").strip("\"'/").lower()
+				for tok in tokens]
+			offset += len(line) + 1
+			continue
+		if len(tokens) < 3:
+			raise FastPathUnsupported("Atom count line, not a point cloud")
+		if not all(is_number(tok) for tok in tokens):
+			raise FastPathUnsupported("Non numeric values, not a point cloud")
+		width = len(tokens)
+		break
+	else:
+		raise FastPathUnsupported("No point values found")
+	if header is None:
+		header = ["x", "y", "z"] + [
+			"column_{}".format(index) for index in range(3, width)]
+	elif len(header) != width:
+		raise FastPathUnsupported("Header does not match the values")
+	return header, offset
+
+
+def decimate_points(rows, xyz, voxel_size):
+	"""Keep the first row of each voxel, in file order"""
+	keys = np.floor(rows[:, xyz] / voxel_size).astype(np.int64)
+	keys = np.ascontiguousarray(keys).view(np.dtype((np.void, 24))).ravel()
+	_, first = np.unique(keys, return_index=True)
+	return rows[np.sort(first)]
+
+
+def parse_points(filepath, voxel_size=0.0, memory_budget=2048):
+	"""Parse an xyz or csv point cloud into one mesh part without faces.
+
+	The file is read CHUNK_SIZE bytes at a time, delimiters replaced by
+	spaces, then parsed by numpy in one go per chunk. With a voxel size
+	each chunk is decimated as it is read, and the points kept are
+	decimated again whenever they pass the memory budget (in MB). Columns
+	besides positions and colors are kept as point attributes.
+	"""
+	with open(filepath, "rb") as fd:
+		names, offset = detect_point_columns(fd.read(64 * 1024))
+	width = len(names)
+	xyz = [
+		names.index(axis) if axis in names else index
+		for index, axis in enumerate("xyz")]
+	budget = memory_budget * 1024 * 1024
+
+	rows = GrowableArray(np.float32, width)
+	tail = b""
+	with open(filepath, "rb") as fd:
+		fd.seek(offset)
+		while True:
+			block = fd.read(CHUNK_SIZE)
+			data = tail + block
+			if block:
+				cut = data.rfind(b"\n") + 1
+				if not cut:
+					tail = data
+					continue
+				data, tail = data[:cut], data[cut:]
+			data = data.translate(POINT_DELIMITERS)
+			if data.strip():
+				values = parse_numbers(data, np.float32)
+				if values.size % width:
+					raise FastPathUnsupported(
+						"Inconsistent number of values per line")
+				values = values.reshape(-1, width)
+				if voxel_size:
+					values = decimate_points(values, xyz, voxel_size)
+				rows.extend(values)
+			if rows.data.nbytes > budget:
+				if voxel_size:
+					kept = decimate_points(rows.view(), xyz, voxel_size)
+					rows = GrowableArray(np.float32, width)
+					rows.extend(kept)
+				if rows.size * width * 4 > budget:
+					raise FastPathUnsupported(
+						"Points exceed the memory budget of {} MB".format(
+							memory_budget))
+			if not block:
+				break
+
+	points = rows.view()
+	if voxel_size:
+		points = decimate_points(points, xyz, voxel_size)
+	part = {
+		"name": os.path.splitext(os.path.basename(filepath))[0],
+		"positions": points[:, xyz],
+		"attributes": {},
+	}
+	used = set(xyz)
+	for color_names in POINT_COLOR_NAMES:
+		if all(name in names for name in color_names):
+			columns = [names.index(name) for name in color_names]
+			colors = points[:, columns]
+			if colors.size and colors.max() > 1.0:
+				colors = colors / np.float32(255.0)
+			part["vertex_colors"] = colors
+			used.update(columns)
+			break
+	for index, name in enumerate(names):
+		if index not in used:
+			part["attributes"][name] = points[:, index]
+	return [part]
+
+
+def parse_mdd(filepath, mode="SHAPE_KEYS", first_frame=0, last_frame=0):
+	"""Map the frames of an mdd point cache, without reading them yet.
+
+	The layout is the frame and point counts as big endian int32, a float32
+	time per frame, then (frames, points, 3) big endian float32 positions.
+	Frames from first_frame up to last_frame (0 for all) become shape keys.
+	In MESH_CACHE mode the file is only referenced, by a modifier reading
+	frames as they are played.
+	"""
+	with open(filepath, "rb") as fd:
+		header = fd.read(8)
+	if len(header) < 8:
+		raise FastPathUnsupported("Truncated mdd header")
+	frames, points = (int(value) for value in np.frombuffer(header, ">i4"))
+	offset = 8 + 4 * frames
+	if frames < 1 or points < 1 or \
+			os.path.getsize(filepath) < offset + frames * points * 12:
+		raise FastPathUnsupported("Unexpected mdd size")
+	last_frame = min(last_frame or frames, frames)
+	first_frame = min(first_frame, last_frame - 1)
+	cache = None
+	if mode != "MESH_CACHE":
+		cache = np.memmap(
+			filepath, dtype=">f4", mode="r", offset=offset,
+			shape=(frames, points, 3))[first_frame:last_frame]
+	return {
+		"filepath": filepath,
+		"name": os.path.splitext(os.path.basename(filepath))[0],
+		"points": points,
+		"first_frame": first_frame,
+		"frames": cache,
+	}
+
+
+def ensure_fcurve(action, datablock, data_path, index=0, group=""):
+	"""Get or create the fcurve of an action assigned to a datablock"""
+	if hasattr(action, "fcurve_ensure_for_datablock"):  # 4.4+
+		return action.fcurve_ensure_for_datablock(
+			datablock, data_path, index=index, group_name=group)
+	fcurve = action.fcurves.find(data_path, index=index)
+	if not fcurve:
+		fcurve = action.fcurves.new(
+			data_path, index=index, action_group=group)
+	return fcurve
+
+
+def set_keyframes(fcurve, times, values, interpolation=None):
+	"""Replace the keyframes of an fcurve by (times, values), in bulk"""
+	points = fcurve.keyframe_points
+	points.clear()
+	points.add(len(times))
+	co = np.empty((len(times), 2), dtype=np.float32)
+	co[:, 0] = times
+	co[:, 1] = values
+	points.foreach_set("co", co.ravel())
+	if interpolation:
+		item = points[0].bl_rna.properties["interpolation"].enum_items
+		try:
+			points.foreach_set("interpolation", np.full(
+				len(times), item[interpolation].value, dtype=np.int32))
+		except (TypeError, RuntimeError):  # enums without raw access
+			for point in points:
+				point.interpolation = interpolation
+	fcurve.update()
+
+
+def apply_mdd(context, cache):
+	"""Apply a parsed mdd cache to the active mesh, as import_shape.mdd does.
+
+	Each frame becomes a shape key written with a single foreach_set, keyed
+	to 1 on its frame and 0 on the frames around it. Only one frame of the
+	memory map is read at a time.
+	"""
+	obj = context.view_layer.objects.active
+	if not obj or obj.type != 'MESH':
+		raise FastPathUnsupported("No active mesh object")
+	if len(obj.data.vertices) != cache["points"]:
+		raise FastPathUnsupported("Active mesh has a different point count")
+	scene = context.scene
+
+	if cache["frames"] is None:
+		modifier = obj.modifiers.new(name=cache["name"], type='MESH_CACHE')
+		modifier.cache_format = 'MDD'
+		modifier.filepath = cache["filepath"]
+		modifier.frame_start = scene.frame_start - cache["first_frame"]
+		return
+
+	if not obj.data.shape_keys:
+		obj.shape_key_add(name="Basis", from_mix=False)
+	shape_keys = obj.data.shape_keys
+	if not shape_keys.animation_data:
+		shape_keys.animation_data_create()
+	action = shape_keys.animation_data.action
+	if not action:
+		action = bpy.data.actions.new(name=cache["name"])
+		shape_keys.animation_data.action = action
+
+	for index, frame in enumerate(cache["frames"]):
+		key = obj.shape_key_add(
+			name="frame_{:04d}".format(cache["first_frame"] + index),
+			from_mix=False)
+		key.data.foreach_set(
+			"co", np.ascontiguousarray(frame, dtype=np.float32).ravel())
+		current = scene.frame_start + index
+		fcurve = ensure_fcurve(
+			action, shape_keys, 'key_blocks["{}"].value'.format(key.name))
+		set_keyframes(
+			fcurve, (current - 1, current, current + 1), (0.0, 1.0, 0.0))
+
+
+def parse_bvh(filepath):
+	"""Parse the hierarchy and motion of a bvh file.
+
+	Returns the joints, with their offsets, end sites and the columns of
+	their channels, and all frames of the MOTION block as one (frames,
+	channels) array parsed by numpy.
+	"""
+	with open(filepath, "rb") as fd:
+		data = fd.read()
+	cut = data.find(b"MOTION")
+	if not data.lstrip().startswith(b"HIERARCHY") or cut == -1:
+		raise FastPathUnsupported("Not a bvh file")
+
+	joints = []
+	stack = []
+	opened = None
+	column = 0
+	for line in data[:cut].decode("utf-8", errors="replace").splitlines():
+		words = line.split()
+		if not words:
+			continue
+		key = words[0].upper()
+		try:
+			if key in ("ROOT", "JOINT"):
+				joints.append({
+					"name": " ".join(words[1:]),
+					"parent": stack[-1] if stack else None,
+					"offset": np.zeros(3),
+					"end": None,
+					"channels": [],
+				})
+				opened = len(joints) - 1
+			elif key == "END":
+				opened = "end"
+			elif key == "{":
+				stack.append(opened)
+			elif key == "}":
+				stack.pop()
+			elif key == "OFFSET":
+				offset = np.array(words[1:4], dtype=np.float64)
+				if stack[-1] == "end":
+					joints[stack[-2]]["end"] = offset
+				else:
+					joints[stack[-1]]["offset"] = offset
+			elif key == "CHANNELS":
+				for name in words[2:2 + int(words[1])]:
+					joints[stack[-1]]["channels"].append((name.lower(), column))
+					column += 1
+		except (IndexError, TypeError, ValueError):
+			raise FastPathUnsupported("Unexpected hierarchy line: " + line)
+	if not joints or stack:
+		raise FastPathUnsupported("Incomplete hierarchy")
+
+	header, _, values = data[cut:].partition(b"Frame Time:")
+	frame_time, _, values = values.partition(b"\n")
+	motion = np.zeros((0, column))
+	if values.strip():
+		motion = parse_numbers(values, np.float64)
+		if not column or motion.size % column:
+			raise FastPathUnsupported("Motion does not match the channels")
+		motion = motion.reshape(-1, column)
+	return {
+		"name": os.path.splitext(os.path.basename(filepath))[0],
+		"joints": joints,
+		"motion": motion,
+	}
+
+
+def bvh_rest_pose(joints):
+	"""World heads and tails of bvh joints, as import_anim.bvh sets them"""
+	count = len(joints)
+	heads = np.zeros((count, 3))
+	children = [[] for _ in range(count)]
+	for index, joint in enumerate(joints):
+		heads[index] = joint["offset"]
+		if joint["parent"] is not None:
+			heads[index] += heads[joint["parent"]]
+			children[joint["parent"]].append(index)
+	tails = heads.copy()
+	for index, joint in enumerate(joints):
+		if joint["end"] is not None:
+			tails[index] = heads[index] + joint["end"]
+		elif children[index]:
+			tails[index] = heads[children[index]].mean(axis=0)
+	zero = np.linalg.norm(tails - heads, axis=1) <= 0.001
+	tails[zero, 1] += 0.1
+	return heads, tails
+
+
+def euler_matrices(motion, channels):
+	"""Per frame (F, 3, 3) rotation of the rotation channels of a joint.
+
+	Channels apply in the order listed, so "Zrotation Xrotation Yrotation"
+	is Rz @ Rx @ Ry.
+	"""
+	matrices = np.broadcast_to(np.identity(3), (len(motion), 3, 3))
+	for name, column in channels:
+		if not name.endswith("rotation"):
+			continue
+		angles = np.radians(motion[:, column])
+		cos, sin = np.cos(angles), np.sin(angles)
+		axis = np.zeros((len(motion), 3, 3))
+		i, j = {"x": (1, 2), "y": (2, 0), "z": (0, 1)}[name[0]]
+		k = 3 - i - j
+		axis[:, k, k] = 1.0
+		axis[:, i, i] = cos
+		axis[:, j, j] = cos
+		axis[:, i, j] = -sin
+		axis[:, j, i] = sin
+		matrices = matrices @ axis
+	return matrices
+
+
+def matrices_to_quaternions(matrices):
+	"""Convert (F, 3, 3) rotations to (F, 4) w, x, y, z quaternions.
+
+	Signs are flipped where needed so consecutive frames interpolate the
+	short way, as keyframes would from Quaternion.make_compatible.
+	"""
+	m = matrices
+	diagonal = np.stack([m[:, 0, 0], m[:, 1, 1], m[:, 2, 2]], axis=1)
+	# Solve from the largest of w, x, y, z for numerical stability
+	largest = np.concatenate(
+		[diagonal.sum(axis=1)[:, None], diagonal], axis=1).argmax(axis=1)
+	signs = np.array([
+		[1, 1, 1], [1, -1, -1], [-1, 1, -1], [-1, -1, 1]])[largest]
+	scale = 2.0 * np.sqrt(np.maximum(
+		1.0 + (signs * diagonal).sum(axis=1), 1e-12))
+	diff_x = m[:, 2, 1] - m[:, 1, 2]
+	diff_y = m[:, 0, 2] - m[:, 2, 0]
+	diff_z = m[:, 1, 0] - m[:, 0, 1]
+	sum_xy = m[:, 0, 1] + m[:, 1, 0]
+	sum_xz = m[:, 0, 2] + m[:, 2, 0]
+	sum_yz = m[:, 1, 2] + m[:, 2, 1]
+	cases = (
+		(None, diff_x, diff_y, diff_z),
+		(diff_x, None, sum_xy, sum_xz),
+		(diff_y, sum_xy, None, sum_yz),
+		(diff_z, sum_xz, sum_yz, None),
+	)
+	quats = np.empty((len(m), 4))
+	for case, row in enumerate(cases):
+		mask = largest == case
+		for col, value in enumerate(row):
+			if value is None:
+				quats[mask, col] = scale[mask] / 4.0
+			else:
+				quats[mask, col] = value[mask] / scale[mask]
+	flips = np.sign(np.einsum("ij,ij->i", quats[1:], quats[:-1]))
+	flips[flips == 0] = 1
+	quats[1:] *= np.cumprod(flips)[:, None]
+	return quats
+
+
+def build_bvh_armature(context, parsed):
+	"""Create an armature and action from a parsed bvh file.
+
+	Matches import_anim.bvh with default settings, except that rotations
+	are keyed as quaternions: bones are built in Z up, and each joint's
+	channels are converted to bone space for all frames at once, then
+	keyed with one foreach_set per fcurve.
+	"""
+	joints = parsed["joints"]
+	motion = parsed["motion"]
+	to_z_up = GLTF_TO_BLENDER[:3, :3]
+	heads, tails = bvh_rest_pose(joints)
+
+	arm_data = bpy.data.armatures.new(parsed["name"])
+	arm_ob = bpy.data.objects.new(parsed["name"], arm_data)
+	get_import_collection(context).objects.link(arm_ob)
+	arm_ob.select_set(True)
+	context.view_layer.objects.active = arm_ob
+	bpy.ops.object.mode_set(mode='EDIT', toggle=False)
+	edit_bones = []
+	for joint, head, tail in zip(
+			joints, y_up_to_z_up(heads), y_up_to_z_up(tails)):
+		bone = arm_data.edit_bones.new(joint["name"])
+		bone.head = head
+		bone.tail = tail
+		edit_bones.append(bone)
+	for joint, bone in zip(joints, edit_bones):
+		parent = joint["parent"]
+		if parent is None:
+			continue
+		bone.parent = edit_bones[parent]
+		# Same test as import_anim.bvh, on the parent tail relative to its
+		# own parent and this joint's offset
+		parent_tail = joints[parent]["offset"] + tails[parent] - heads[parent]
+		has_loc = any(
+			channel.endswith("position") for channel, _ in joint["channels"])
+		if not has_loc and np.allclose(parent_tail, joint["offset"]):
+			bone.use_connect = True
+	names = [bone.name for bone in edit_bones]
+	bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+
+	arm_ob.animation_data_create()
+	action = bpy.data.actions.new(name=parsed["name"])
+	arm_ob.animation_data.action = action
+	times = 1.0 + np.arange(len(motion))
+	if not len(motion):
+		return [arm_ob]
+	for joint, name in zip(joints, names):
+		pose_bone = arm_ob.pose.bones[name]
+		pose_bone.rotation_mode = 'QUATERNION'
+		rest = np.array(arm_data.bones[name].matrix_local.to_3x3())
+		# Bvh space to bone space
+		space = to_z_up.T @ rest
+		channels = dict(joint["channels"])
+		if any(channel.endswith("position") for channel in channels):
+			location = np.stack([
+				motion[:, channels[axis + "position"]]
+				if axis + "position" in channels else np.zeros(len(motion))
+				for axis in "xyz"], axis=1)
+			location = (location - joint["offset"]) @ space
+			data_path = 'pose.bones["{}"].location'.format(name)
+			for index in range(3):
+				fcurve = ensure_fcurve(
+					action, arm_ob, data_path, index=index, group=name)
+				set_keyframes(fcurve, times, location[:, index], 'LINEAR')
+		if any(channel.endswith("rotation") for channel in channels):
+			rotation = space.T @ euler_matrices(
+				motion, joint["channels"]) @ space
+			quats = matrices_to_quaternions(rotation)
+			data_path = 'pose.bones["{}"].rotation_quaternion'.format(name)
+			for index in range(4):
+				fcurve = ensure_fcurve(
+					action, arm_ob, data_path, index=index, group=name)
+				set_keyframes(fcurve, times, quats[:, index], 'LINEAR')
+	return [arm_ob]
+
+
+# Extensions whose parse only maps the file, not worth a parse process
+LAZY_FAST_HANDLERS = ("mdd",)
+
+# Arrays smaller than this are pickled from parse processes, not shared
+SHARED_MIN_BYTES = 64 * 1024
+
+
+# Built-in numpy readers by extension: (parse, build). Parse functions only
+# read the file into arrays, build functions create the blender data.
+FAST_HANDLERS = {
+	"bvh": (parse_bvh, build_bvh_armature),
+	"csv": (parse_points, build_mesh_objects),
+	"glb": (parse_gltf, build_mesh_objects),
+	"gltf": (parse_gltf, build_mesh_objects),
+	"mdd": (parse_mdd, apply_mdd),
+	"obj": (parse_obj, build_mesh_objects),
+	"ply": (parse_ply, build_mesh_objects),
+	"stl": (parse_stl, build_mesh_objects),
+	"xyz": (parse_points, build_mesh_objects),
+}
+
+
+def get_operator_settings(context, oper):
+	"""Capture the last used settings of an operator, except file selection"""
+	props = context.window_manager.operator_properties_last(oper)
+	settings = {}
+	if not props:
+		return settings
+	skip = {"rna_type", "filepath", "directory", "files", "filename"}
+	for prop in props.bl_rna.properties:
+		key = prop.identifier
+		if key in skip or key.startswith("filter_") or prop.is_readonly:
+			continue
+		if prop.type in {'POINTER', 'COLLECTION'}:
+			continue
+		value = getattr(props, key)
+		if getattr(prop, "is_array", False):
+			value = tuple(value)
+		settings[key] = value
+	return settings
+
+
+def resolve_dispatch(context, ext):
+	"""Resolve the operator, its function and kwargs template per extension.
+
+	Cached for the queue being drained, so operator_properties_last is only
+	introspected once per extension rather than once per file.
+	"""
+	dispatch = queue_state.setdefault("dispatch", {})
+	if ext in dispatch:
+		return dispatch[ext]
+
+	oper = get_association_index(context).get(ext, (None, None))[1]
+	if not oper:
+		raise RuntimeError("No operator associated with ." + ext)
+	base, oprs = oper.split(".")
+	oper_func = getattr(getattr(bpy.ops, base), oprs)
+	dispatch[ext] = (oper, oper_func, get_kwargs_template(context, oper))
+	return dispatch[ext]
+
+
+def get_kwargs_template(context, oper):
+	"""Detect which of filepath, directory and files an operator accepts"""
 	props = context.window_manager.operator_properties_last(oper)
 	bfilepath = hasattr(props, "filepath")
 	bdirectory = hasattr(props, "directory")
 	bfiles = hasattr(props, "files")
+	return (bfilepath, bdirectory, bfiles)
+
+
+def get_kwargs(template, directory, files):
+	"""Conditionals to detect the best keyword args to use for an operator.
+
+	Returns a list of kwargs, one per operator call needed to import all of
+	the given files. Operators which only take a filepath get one call each.
+	"""
+	bfilepath, bdirectory, bfiles = template
 
 	# capture as many scenarios as possible, won't be perfect
 	# and only when necessary (based on the operator), do special cases
-	kwargs = {}
+	calls = []
 	if bfilepath and bdirectory and bfiles:
 		# Example: bpy.ops.import_mesh.stl
+		kwargs = {}
 		kwargs["filepath"] = os.path.join(directory, files[0])
 		kwargs["directory"] = directory
 		# Yes, this structure is right based on examples like above
 		kwargs["files"] = [{"name": name, "name": name} for name in files]
+		calls.append(kwargs)
 	elif bfilepath and bdirectory and not bfiles:
 		# Example: import_scene.fbx
-		kwargs["filepath"] = files[0]
-		kwargs["directory"] = directory
+		for name in files:
+			calls.append({
+				"filepath": os.path.join(directory, name),
+				"directory": directory})
 	elif bfilepath and not bdirectory:
 		# Example: import_scene.obj
-		kwargs["filepath"] = os.path.join(directory, files[0])
+		for name in files:
+			calls.append({"filepath": os.path.join(directory, name)})
 	elif bfiles and bdirectory:
 		# example: import_image.to_plane
+		kwargs = {}
 		kwargs["files"] = [{"name": name, "name": name} for name in files]
 		kwargs["directory"] = directory
-	return kwargs
+		calls.append(kwargs)
+	else:
+		calls.append({})
+	return calls
 
 
 def get_prefs_extensions(context):
-	"""Return a comma separated list of the include extensions"""
+	"""Return a semicolon separated glob of the included extensions.
+
+	Extensions read by the fast handlers are included when those are enabled,
+	even without an associated operator. Memoized as this runs on each redraw
+	of the import menu.
+	"""
+	global association_glob
+	index = get_association_index(context)
 	prefs = get_user_preferences(context)
-	return ";".join(["*" + pset.extension for pset in prefs.file_extensions])
+	fast = bool(prefs and prefs.use_fast_handlers)
+	if (association_glob is None or association_glob[0] is not index
+			or association_glob[1] != fast):
+		# Defaults have no index, before the associations are first set up
+		exts = sorted(index, key=lambda ext: index[ext][0] or 0)
+		if fast:
+			exts += [ext for ext in sorted(FAST_HANDLERS) if ext not in index]
+		glob = ";".join(["*" + ext for ext in exts])
+		association_glob = (index, fast, glob)
+	return association_glob[2]
 
 
 def import_draw_append(self, context):
@@ -256,54 +3535,17 @@ class IMPORT_OT_import_any_reset_extensions(bpy.types.Operator):
 	bl_options = {'REGISTER', 'UNDO'}
 
 	def execute(self, context):
-		reset_oper_cache()
-
 		prefs = get_user_preferences(context)
 		prefs.file_extensions.clear()
 
-		defaults = {
-			# confirmed working
-			"bvh": "import_anim.bvh",
-			"fbx": "import_scene.fbx",
-			"obj": "import_scene.obj",
-
-			# should work
-			"abc": "wm.alembic_import",
-			"dae": "wm.collada_import",
-			"stl": "import_mesh.stl",
-			"svg": "import_curve.svg",
-			"dxf": "import_scene.dxf",
-			"ase": "import_ase.read",
-			"mdd": "import_shape.mdd",
-			"chan": "import_scene.import_chan",
-			"wrl": "import_scene.x3d",
-			"x3d": "import_scene.x3d",
-			"xyz": "import_mesh.xyz",  # also implements .pdb?
-			"txt": "text.open",
-			"rtf": "text.open",
-			"py": "text.open",
-
-			# Implement special case, where defaults to e.g. scene or collections
-			"blend": "wm.append"
-
-			# NOT working
-			# "jpg": "import_image.to_plane",
-			# "jpeg": "import_image.to_plane",
-			# "png": "import_image.to_plane",
-
-			# Probably not working
-			# "ply": "import_mesh.ply"
-			# "glb": "import_scene.gltf"
-			# "gltf": "import_scene.gltf"
-		}
-
-		for ext in sorted(defaults):
+		for ext in sorted(DEFAULT_ASSOCIATIONS):
 			# Opt to set up, even if not currently available
-			# if not operator_exists(defaults[ext]):
+			# if not operator_exists(DEFAULT_ASSOCIATIONS[ext]):
 			# 	continue
 			new = prefs.file_extensions.add()
 			new.extension = ext
-			new.operator = defaults[ext]
+			new.operator = DEFAULT_ASSOCIATIONS[ext]
+		invalidate_association_index()
 		return {'FINISHED'}
 
 
@@ -319,18 +3561,16 @@ class IMPORT_OT_import_any_add_extension(bpy.types.Operator):
 		return context.window_manager.invoke_props_dialog(self)
 
 	def execute(self, context):
-		reset_oper_cache()
-
 		this_ext = self.extension.replace(".", "").lower()
 		prefs = get_user_preferences(context)
-		curr_exts = [ext.extension for ext in prefs.file_extensions]
-		if this_ext in curr_exts:
+		if this_ext in get_association_index(context):
 			self.report({"ERROR"}, "Extension already defined")
 			return {'CANCELLED'}
 
 		itm = prefs.file_extensions.add()
 		itm.extension = this_ext
 		itm.operator = ""
+		invalidate_association_index()
 		return {'FINISHED'}
 
 
@@ -343,18 +3583,12 @@ class IMPORT_OT_import_any_remove_extension(bpy.types.Operator):
 	extension = bpy.props.StringProperty(name="Extension", default="")
 
 	def execute(self, context):
-		reset_oper_cache()
-
 		prefs = get_user_preferences(context)
-		pop = None
-		for i, ext in enumerate(prefs.file_extensions):
-			if ext.extension != self.extension:
-				continue
-			pop = i
-			break
+		pop = get_association_index(context).get(self.extension)
 		if pop is not None:
 			print("Removing extension association:" + self.extension)
-			prefs.file_extensions.remove(pop)
+			prefs.file_extensions.remove(pop[0])
+			invalidate_association_index()
 			return {'FINISHED'}
 		else:
 			self.report(
@@ -368,6 +3602,7 @@ def operator_code_update(self, context):
 
 	Goal is to go from bpy.ops.import_scene.obj() to import_scene.obj
 	"""
+	invalidate_association_index()
 	truncate_suffix = self.operator.endswith("()")
 	new_base = None
 	if len(self.operator.split(".")) == 4:
@@ -393,8 +3628,106 @@ class FileAssociation(bpy.types.PropertyGroup):
 class AardvarkImporterPreferences(bpy.types.AddonPreferences):
 	bl_idname = __name__
 	file_extensions = bpy.props.CollectionProperty(type=FileAssociation)
+	use_direct_calls = bpy.props.BoolProperty(
+		name="Direct importer calls",
+		description=(
+			"When using default settings, call built-in python importers "
+			"(bvh, x3d, mdd, svg) directly instead of through bpy.ops"),
+		default=False)
+	use_fast_handlers = bpy.props.BoolProperty(
+		name="Fast built-in readers",
+		description=(
+			"Read supported formats (bvh, csv, glb, gltf, mdd, obj, ply, "
+			"stl, xyz) with the add-on's own numpy based readers. Falls back to "
+			"the associated operator for unsupported files"),
+		default=False)
+	point_voxel_size = bpy.props.FloatProperty(
+		name="Point cloud voxel size",
+		description=(
+			"Keep one point per voxel of this size when reading xyz and csv "
+			"point clouds with the fast readers, 0 keeps all points"),
+		default=0.0, min=0.0, subtype='DISTANCE')
+	point_memory_budget = bpy.props.IntProperty(
+		name="Point cloud memory (MB)",
+		description=(
+			"Maximum memory for the points of one xyz or csv file. Larger "
+			"files need a voxel size, or are left to the associated operator"),
+		default=2048, min=64)
+	parse_processes = bpy.props.IntProperty(
+		name="Parse processes",
+		description=(
+			"Parse files for the fast readers ahead in this many processes, "
+			"while this session builds the previous files. 0 parses each "
+			"file when it is imported"),
+		default=0, min=0, max=64)
+	tick_budget = bpy.props.IntProperty(
+		name="Main thread budget (ms)",
+		description=(
+			"Import queued files, or load results of background workers, for "
+			"up to this long per update, keeping the interface responsive "
+			"in between. At least one file is imported per update"),
+		default=20, min=1, max=1000)
+	use_import_cache = bpy.props.BoolProperty(
+		name="Import cache",
+		description=(
+			"Save what each file imports to a cache, and load it from there "
+			"when the same file content is imported again with the same "
+			"settings"),
+		default=False)
+	cache_directory = bpy.props.StringProperty(
+		name="Cache folder",
+		description="Folder of the import cache, the system temp folder if empty",
+		subtype='DIR_PATH',
+		default="")
+	cache_size = bpy.props.IntProperty(
+		name="Cache size (MB)",
+		description=(
+			"Remove the least recently used cached imports past this size"),
+		default=4096, min=16)
+	dedupe_files = bpy.props.BoolProperty(
+		name="Instance identical files",
+		description=(
+			"Import files with identical content only once, adding linked "
+			"duplicates sharing the same data for the other files"),
+		default=False)
+	share_identical_meshes = bpy.props.BoolProperty(
+		name="Share identical meshes",
+		description=(
+			"Once an import is done, make objects with identical new meshes "
+			"(e.g. repeated bolts) share one mesh, removing the copies"),
+		default=False)
+	mdd_mode = bpy.props.EnumProperty(
+		name="Mdd caches",
+		description="How the fast reader applies mdd files to the active mesh",
+		items=(
+			('SHAPE_KEYS', "Shape keys",
+				"A keyed shape key per frame, as import_shape.mdd does"),
+			('MESH_CACHE', "Mesh cache",
+				"A mesh cache modifier, reading frames from the file as played")),
+		default='SHAPE_KEYS')
+	mdd_first_frame = bpy.props.IntProperty(
+		name="First frame",
+		description="First frame of mdd files to load, counting from 0",
+		default=0, min=0)
+	mdd_last_frame = bpy.props.IntProperty(
+		name="Last frame",
+		description="Load mdd frames up to this one, 0 loads all frames",
+		default=0, min=0)
+	parallel_workers = bpy.props.IntProperty(
+		name="Background workers",
+		description=(
+			"When using default settings, split the import across this many "
+			"background blender processes. 0 or 1 imports in this session"),
+		default=0, min=0, max=256, soft_max=64)
+	keep_workers_warm = bpy.props.BoolProperty(
+		name="Keep workers running",
+		description=(
+			"Keep the background workers running between imports, so their "
+			"startup time is only paid once"),
+		default=False)
 
 	def draw(self, context):
+		sync_oper_cache(context)
 		layout = self.layout
 		row = layout.row()
 		col = row.column()
@@ -404,6 +3737,38 @@ class AardvarkImporterPreferences(bpy.types.AddonPreferences):
 			"For each extension, enter the operator name (similar "
 			"to how shortcut keys are defined)."))
 
+		box = layout.box()
+		box.label(text="Performance")
+		box.prop(self, "use_direct_calls")
+		row = box.row()
+		row.prop(self, "use_fast_handlers")
+		sub = row.row()
+		sub.enabled = self.use_fast_handlers
+		sub.prop(self, "parse_processes")
+		row = box.row()
+		row.enabled = self.use_fast_handlers
+		row.prop(self, "point_voxel_size")
+		row.prop(self, "point_memory_budget")
+		row = box.row()
+		row.enabled = self.use_fast_handlers
+		row.prop(self, "mdd_mode", text="")
+		row.prop(self, "mdd_first_frame")
+		row.prop(self, "mdd_last_frame")
+		row = box.row()
+		row.prop(self, "parallel_workers")
+		row.prop(self, "keep_workers_warm")
+		row = box.row()
+		row.prop(self, "tick_budget")
+		row = box.row()
+		row.prop(self, "dedupe_files")
+		row.prop(self, "share_identical_meshes")
+		row = box.row()
+		row.prop(self, "use_import_cache")
+		sub = row.row()
+		sub.enabled = self.use_import_cache
+		sub.prop(self, "cache_directory", text="")
+		sub.prop(self, "cache_size")
+
 		col = layout.column(align=True)
 		row = col.row()
 		row.operator("import_any.add_extension", text="Add extension")
@@ -446,6 +3811,176 @@ class AardvarkImporterPreferences(bpy.types.AddonPreferences):
 						icon="ERROR")
 
 
+def parse_cli_args(argv):
+	"""Parse command line arguments given after blender's -- separator"""
+	parser = argparse.ArgumentParser(
+		prog="blender -b --python aardvark_any_importer.py --",
+		description="Import files with their associated importers, headless")
+	parser.add_argument(
+		"paths", nargs="*",
+		help="Files to import, folders import the files directly inside")
+	parser.add_argument(
+		"--paths-file", help="Text file listing files to import, one per line")
+	parser.add_argument(
+		"--out", help="Save the resulting scene to this blend file")
+	parser.add_argument(
+		"--only-imported", action="store_true",
+		help="Save only the imported objects (and their data) to --out")
+	parser.add_argument(
+		"--report", help="Write the success of each file to this json file")
+	parser.add_argument(
+		"--assoc", action="append", default=[], metavar="EXT=OPERATOR",
+		help="Add or override an association, e.g. obj=wm.obj_import")
+	parser.add_argument(
+		"--direct", action="store_true",
+		help="Call known python importers directly instead of via bpy.ops")
+	parser.add_argument(
+		"--fast", action="store_true",
+		help="Use the built-in numpy readers for supported formats")
+	parser.add_argument(
+		"--voxel-size", type=float, default=0.0,
+		help="Keep one point per voxel of this size in point clouds, 0 keeps all")
+	parser.add_argument(
+		"--memory-budget", type=int, default=2048,
+		help="Maximum memory in MB for the points of one point cloud")
+	parser.add_argument(
+		"--parse-processes", type=int, default=0,
+		help="Parse files for the fast readers ahead in this many processes")
+	parser.add_argument(
+		"--dedupe", action="store_true",
+		help="Import identical files once, as linked duplicates")
+	parser.add_argument(
+		"--share-meshes", action="store_true",
+		help="Make objects with identical imported meshes share one mesh")
+	parser.add_argument(
+		"--cache-dir",
+		help="Load and save imports in this import cache folder")
+	parser.add_argument(
+		"--worker", action="store_true",
+		help="Serve import jobs as json lines on stdin, see ImportWorkerPool")
+	return parser.parse_args(argv)
+
+
+def main_cli(argv):
+	"""Import files given on the command line, returns the exit status"""
+	args = parse_cli_args(argv)
+	if args.worker:
+		return run_import_worker()
+	for assoc in args.assoc:
+		ext, _, oper = assoc.partition("=")
+		cli_associations[ext.replace(".", "").lower()] = oper
+
+	arg_paths = list(args.paths)
+	if args.paths_file:
+		with open(args.paths_file) as fd:
+			arg_paths.extend(line.strip() for line in fd if line.strip())
+
+	paths = []
+	for path in arg_paths:
+		path = os.path.abspath(path)
+		if os.path.isdir(path):
+			paths.extend(
+				os.path.join(path, name) for name in sorted(os.listdir(path))
+				if os.path.isfile(os.path.join(path, name)))
+		else:
+			paths.append(path)
+
+	options = get_import_options()
+	options["undo"] = False
+	options["direct"] = args.direct
+	options["fast"] = args.fast
+	options["voxel_size"] = args.voxel_size
+	options["memory_budget"] = args.memory_budget
+	options["parse_processes"] = args.parse_processes
+	options["dedupe"] = args.dedupe
+	options["share_meshes"] = args.share_meshes
+	# Only objects are saved, so files importing none would be lost
+	options["require_objects"] = bool(args.out and args.only_imported)
+	if args.cache_dir:
+		options["cache"] = True
+		options["cache_dir"] = os.path.abspath(args.cache_dir)
+
+	associations = get_association_index()
+	ext_missing = []
+	jobs = []
+	for ext, ext_paths in group_files_by_extension(paths).items():
+		if ext not in associations and not has_fast_handler(ext, options):
+			ext_missing.append(ext or "(none)")
+			continue
+		jobs.extend((path, ext) for path in ext_paths)
+	if ext_missing:
+		print("Extensions not associated: " + ", ".join(ext_missing))
+
+	before = set(bpy.data.objects)
+	queue_imports(jobs, "defaults", options, use_timer=False)
+	drain_import_queue()
+
+	if args.report:
+		with open(args.report, "w") as fd:
+			json.dump(import_queue, fd)
+	if args.out and args.only_imported:
+		imported = set(obj for obj in bpy.data.objects if obj not in before)
+		if imported:
+			bpy.data.libraries.write(os.path.abspath(args.out), imported)
+	elif args.out:
+		bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(args.out))
+	if ext_missing or not all(import_queue.values()):
+		return 1
+	return 0
+
+
+def run_worker_job(job):
+	"""Import the file of a worker job, returns whether it succeeded"""
+	if job.get("fast"):
+		try:
+			import_fast(
+				bpy.context, job["filepath"], job.get("fast_settings"))
+			return True
+		except FastPathUnsupported as err:
+			if not job["operator"]:
+				raise
+			print("Fast import unsupported, using operator: " + str(err))
+	base, oprs = job["operator"].split(".")
+	oper_func = getattr(getattr(bpy.ops, base), oprs)
+	res = set()
+	for kwargs in job["calls"]:
+		res |= oper_func('EXEC_DEFAULT', False, **kwargs)
+	return 'CANCELLED' not in res
+
+
+def run_import_worker():
+	"""Serve import jobs read from stdin, until it is closed.
+
+	Each job is a json line with the operator and the list of kwargs to call
+	it with, as from get_kwargs. The imported objects are written to the job's
+	out file and removed again, and the result is printed as a json line.
+	"""
+	print(WORKER_PREFIX + json.dumps({"ready": True}), flush=True)
+	for line in sys.stdin:
+		if not line.strip():
+			continue
+		job = json.loads(line)
+		result = {"id": job["id"], "success": False, "error": None}
+		before = set(bpy.data.objects)
+		try:
+			result["success"] = run_worker_job(job)
+		except Exception as err:
+			result["error"] = str(err)
+
+		imported = set(obj for obj in bpy.data.objects if obj not in before)
+		if result["success"] and not imported:
+			# Only objects are written back, e.g. texts would be lost
+			result["success"] = False
+			result["error"] = "No objects imported"
+		if imported:
+			bpy.data.libraries.write(job["out"], imported)
+			bpy.data.batch_remove(imported)
+			if hasattr(bpy.data, "orphans_purge"):  # 3.0+
+				bpy.data.orphans_purge(do_recursive=True)
+		print(WORKER_PREFIX + json.dumps(result), flush=True)
+	return 0
+
+
 classes = (
 	FileAssociation,
 	AardvarkImporterPreferences,
@@ -484,10 +4019,24 @@ def unregister():
 		km.keymap_items.remove(kmi)
 	addon_keymaps.clear()
 
+	if bpy.app.timers.is_registered(process_import_queue):
+		bpy.app.timers.unregister(process_import_queue)
+	if bpy.app.timers.is_registered(process_sharded_import):
+		bpy.app.timers.unregister(process_sharded_import)
+	for shard in shard_state.get("shards") or []:
+		shard["process"].kill()
+	if bpy.app.timers.is_registered(process_pool_import):
+		bpy.app.timers.unregister(process_pool_import)
+	if worker_pool is not None:
+		worker_pool.shutdown()
+	shutdown_parse_pool()
+
 	bpy.types.TOPBAR_MT_file_import.remove(import_draw_append)
 	for cls in reversed(classes):
 		bpy.utils.unregister_class(cls)
 
 
 if __name__ == "__main__":
+	if bpy.app.background and "--" in sys.argv:
+		sys.exit(main_cli(sys.argv[sys.argv.index("--") + 1:]))
 	register()